@@ -2,6 +2,7 @@ from pydantic import BaseModel, ConfigDict, Field, computed_field
 from typing import Optional, List, Generic, TypeVar
 from datetime import datetime, timezone, date
 from enum import Enum
+from app.utils.images import variants_of, image_urls
 
 T = TypeVar("T")
 
@@ -18,6 +19,10 @@ class UserResponse(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+    @computed_field
+    def profile_picture_variants(self) -> dict[str, str] | None:
+        return variants_of(self.profile_picture)
+
 
 class LoginResponse(BaseModel):
     username: str
@@ -33,10 +38,15 @@ class Chat(BaseModel):
     delivered: bool = False
     seen: bool = False
     time_of_chat: Optional[datetime]
-    conversation_id: str | None = None
+    conversation_id: str | None = Field(None, validation_alias="conversation_key")
+    conversation_pk: int | None = Field(None, validation_alias="conversation_id")
 
     model_config = ConfigDict(from_attributes=True)
 
+    @computed_field
+    def pics_variants(self) -> dict[str, str] | None:
+        return variants_of(self.pics)
+
 
 class UserRes(BaseModel):
     profile_picture: str | None = None
@@ -304,7 +314,10 @@ class TaskResponseG(BaseModel):
 class PaginatedResponse(BaseModel):
     page: int
     limit: int
-    total: int
+    total: int | None = None
+    has_more: bool | None = None
+    next_cursor: str | None = None
+    count_strategy: str | None = None
 
 
 class PaginatedMetadata(BaseModel, Generic[T]):
@@ -347,7 +360,7 @@ class Commenter(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
-class Blogger(BaseModel):
+class BlogListing(BaseModel):
     id: Optional[int] = None
     profile_picture: List[str] = Field(default_factory=list)
     name: List[str] = Field(default_factory=list)
@@ -358,11 +371,22 @@ class Blogger(BaseModel):
     reacts_count: int | None = None
     comments_count: int | None = None
     share_count: int | None = None
-    comments: List[Commenter] = Field(default_factory=list)
     time_of_post: Optional[datetime] = None
 
     model_config = ConfigDict(from_attributes=True)
 
+    @computed_field
+    def image_variants(self) -> List[dict[str, str] | None]:
+        return [variants_of(url) for url in image_urls(self.image)]
+
+    @computed_field
+    def profile_picture_variants(self) -> List[dict[str, str] | None]:
+        return [variants_of(url) for url in self.profile_picture]
+
+
+class Blogger(BlogListing):
+    comments: List[Commenter] = Field(default_factory=list)
+
 
 class Sharing(Enum):
     love = "love"
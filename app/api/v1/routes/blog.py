@@ -1,6 +1,16 @@
-from fastapi import APIRouter, Depends, Query, File, Form, UploadFile
+from fastapi import (
+    APIRouter,
+    Depends,
+    Query,
+    File,
+    Form,
+    UploadFile,
+    Request,
+    Response,
+)
 from app.api.v1.models import (
     Blogger,
+    BlogListing,
     PaginatedMetadata,
     StandardResponse,
 )
@@ -10,6 +20,7 @@ from app.auth.verify_jwt import verify_token
 from app.log.logger import get_loggers
 from typing import List
 from app.services import blog_service
+from app.utils.etag import conditional
 
 router = APIRouter(prefix="/blogs", tags=["Blog"])
 logger = get_loggers("blogs")
@@ -30,23 +41,31 @@ async def express(
 
 @router.get(
     "/view",
-    response_model=StandardResponse[PaginatedMetadata[Blogger]],
+    response_model=StandardResponse[PaginatedMetadata[BlogListing]],
     response_model_exclude_none=True,
 )
 async def view(
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1),
     limit: int = Query(10, le=100),
+    cursor: str | None = None,
     db: AsyncSession = Depends(get_db),
     payload: dict = Depends(verify_token),
 ):
+    unchanged = conditional(
+        request, response, await blog_service.feed_version(page, limit, cursor)
+    )
+    if unchanged:
+        return unchanged
     return await blog_service.retrieve_all(
-        db=db, payload=payload, page=page, limit=limit
+        db=db, payload=payload, page=page, limit=limit, cursor=cursor
     )
 
 
 @router.get(
     "/search",
-    response_model=StandardResponse[PaginatedMetadata[Blogger]],
+    response_model=StandardResponse[PaginatedMetadata[BlogListing]],
     response_model_exclude_none=True,
 )
 async def sift(
@@ -64,18 +83,24 @@ async def sift(
 
 @router.get(
     "/discover",
-    response_model=StandardResponse[PaginatedMetadata[Blogger]],
+    response_model=StandardResponse[PaginatedMetadata[BlogListing]],
     response_model_exclude_none=True,
 )
 async def trends(
-    sorting: str = Query("recent", enum=["popular", "recent"]),
+    sorting: str = Query("recent", enum=["popular", "recent", "hot"]),
     page: int = Query(1, ge=1),
     limit: int = Query(10, le=100),
+    cursor: str | None = None,
     db: AsyncSession = Depends(get_db),
     payload: dict = Depends(verify_token),
 ):
     return await blog_service.view_trending(
-        db=db, payload=payload, sorting=sorting, page=page, limit=limit
+        db=db,
+        payload=payload,
+        sorting=sorting,
+        page=page,
+        limit=limit,
+        cursor=cursor,
     )
 
 
@@ -86,9 +111,16 @@ async def trends(
 )
 async def view_one(
     blog_id: int,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     payload: dict = Depends(verify_token),
 ):
+    unchanged = conditional(
+        request, response, await blog_service.blog_version(db, blog_id)
+    )
+    if unchanged:
+        return unchanged
     return await blog_service.fetch_some(db=db, payload=payload, blog_id=blog_id)
 
 
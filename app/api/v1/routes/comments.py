@@ -43,6 +43,31 @@ async def view(
     return await comment_service.view(db=db, payload=payload, page=page, limit=limit)
 
 
+@router.get(
+    "/blog/{blog_id}",
+    response_model=StandardResponse[PaginatedMetadata[Commenter]],
+    response_model_exclude_none=True,
+)
+async def blog_comments(
+    blog_id: int,
+    sorting: str = Query("recent", enum=["popular", "recent"]),
+    page: int = Query(1, ge=1),
+    limit: int = Query(10, le=100),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(get_db),
+    payload: dict = Depends(verify_token),
+):
+    return await comment_service.blog_comments(
+        blog_id=blog_id,
+        sorting=sorting,
+        page=page,
+        limit=limit,
+        cursor=cursor,
+        db=db,
+        payload=payload,
+    )
+
+
 @router.get(
     "/retrieve_specific_comments/{comment_id}",
     response_model=StandardResponse[Commenter],
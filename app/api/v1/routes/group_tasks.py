@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.auth.verify_jwt import verify_token
 from app.core.db_session import get_db
@@ -13,6 +13,7 @@ from app.api.v1.models import (
     TaskRes,
 )
 from app.services import grouptask_service
+from app.utils.etag import conditional
 
 router = APIRouter(prefix="/g_tasks", tags=["Group Tasks"])
 
@@ -55,11 +56,17 @@ async def piggy_bank(
 )
 async def view(
     group_id: int,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     page: int = Query(1, ge=1),
     limit: int = Query(10, le=100),
     payload: dict = Depends(verify_token),
 ):
+    version = await grouptask_service.tasks_version(db, group_id, payload, page, limit)
+    unchanged = conditional(request, response, version)
+    if unchanged:
+        return unchanged
     return await grouptask_service.view_all_tasks(
         db=db, payload=payload, group_id=group_id, page=page, limit=limit
     )
@@ -73,9 +80,15 @@ async def view(
 async def one_task(
     group_id: int,
     task_id: int,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     payload: dict = Depends(verify_token),
 ):
+    version = await grouptask_service.task_version(db, group_id, task_id, payload)
+    unchanged = conditional(request, response, version)
+    if unchanged:
+        return unchanged
     return await grouptask_service.fetch_some(
         group_id=group_id, task_id=task_id, db=db, payload=payload
     )
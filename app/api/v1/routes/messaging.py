@@ -2,6 +2,7 @@ from app.api.v1.models import (
     StandardResponse,
 )
 from fastapi import APIRouter, Depends, Query, File, UploadFile
+from typing import Literal
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.db_session import get_db
 from app.auth.verify_jwt import verify_token
@@ -49,14 +50,35 @@ async def view_messages(
     response_model_exclude_none=True,
 )
 async def view_message(
-    receiver: str | None = None,
+    receiver: str,
     page: int = Query(1, ge=1),
     limit: int = Query(10, le=100),
+    before: int | None = Query(None, ge=1),
+    after: int | None = Query(None, ge=1),
     db: AsyncSession = Depends(get_db),
     payload: dict = Depends(verify_token),
 ):
     return await messaging_service.view_message(
-        receiver=receiver, page=page, limit=limit, db=db, payload=payload
+        receiver=receiver,
+        page=page,
+        limit=limit,
+        db=db,
+        payload=payload,
+        before=before,
+        after=after,
+    )
+
+
+@router.post("/ack")
+async def acknowledge(
+    receiver: str,
+    upto_id: int = Query(..., ge=1),
+    status: Literal["delivered", "seen"] = "seen",
+    db: AsyncSession = Depends(get_db),
+    payload: dict = Depends(verify_token),
+):
+    return await messaging_service.acknowledge_messages(
+        receiver=receiver, upto_id=upto_id, status=status, db=db, payload=payload
     )
 
 
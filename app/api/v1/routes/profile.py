@@ -5,11 +5,14 @@ from fastapi import (
     Form,
     File,
     UploadFile,
+    Request,
+    Response,
 )
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.db_session import get_db
 from app.auth.verify_jwt import verify_token
 from app.services import profile_service
+from app.utils.etag import conditional
 
 
 router = APIRouter(prefix="/info", tags=["Profile"])
@@ -19,11 +22,19 @@ router = APIRouter(prefix="/info", tags=["Profile"])
     "/profile",
 )
 async def view(
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1),
     limit: int = Query(10, le=100),
     db: AsyncSession = Depends(get_db),
     payload: dict = Depends(verify_token),
 ):
+    version = await profile_service.profile_version(
+        db, payload.get("user_id"), page, limit
+    )
+    unchanged = conditional(request, response, version)
+    if unchanged:
+        return unchanged
     return await profile_service.view(db=db, payload=payload, page=page, limit=limit)
 
 
@@ -8,7 +8,6 @@ from fastapi import (
 )
 from app.core.db_session import get_db
 from sqlalchemy import select, or_
-from typing import Dict
 from app.models_sql import Messaging, User
 from app.log.logger import get_loggers
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -16,19 +15,22 @@ from datetime import datetime, timezone
 from app.core.scheduler import send_email_name
 from jose import jwt, JWTError
 from app.core.config import settings
+from app.services.messaging_service import record_message
+from app.services.receipt_service import acknowledge
+from app.core.chat_broker import broker
 
 
 router = APIRouter(prefix="/Chatbox", tags=["instantmessaging"])
 logger = get_loggers("ichat")
 
-active_connections: Dict[int, WebSocket] = {}
 
-
-async def connect(user_id: int, web: WebSocket, db: AsyncSession):
+async def connect(user_id: int, username: str, web: WebSocket, db: AsyncSession):
     await web.accept()
-    active_connections[user_id] = web
-    stmt = select(Messaging).where(
-        Messaging.receiver_id == user_id, Messaging.delivered.is_(False)
+    await broker.register(user_id, web)
+    stmt = (
+        select(Messaging)
+        .where(Messaging.receiver == username, Messaging.delivered.is_not(True))
+        .order_by(Messaging.id)
     )
     pending = (await db.execute(stmt)).scalars().all()
     for msg in pending:
@@ -36,14 +38,13 @@ async def connect(user_id: int, web: WebSocket, db: AsyncSession):
             await web.send_text(f"{msg.user_id}: {msg.message}")
         if msg.pics:
             await web.send_bytes(msg.pics)
-        msg.delivered = True
-        db.add(msg)
+    if pending:
+        await acknowledge(db, username, pending[-1].id, "delivered")
         await db.commit()
 
 
-async def disconnect(user_id: int):
-    if user_id in active_connections:
-        del active_connections[user_id]
+async def disconnect(user_id: int, web: WebSocket):
+    await broker.unregister(user_id, web)
 
 
 @router.websocket("/chat/{username}")
@@ -74,35 +75,29 @@ async def chatterbox(
     tap = (await db.execute(stmt)).scalar_one_or_none()
     if not tap:
         raise HTTPException(status_code=404, detail="user not found")
-    await connect(user_id, web, db)
+    await connect(user_id, username_from_token, web, db)
     logger.info(f"{username} ({user_id}) connected to chat with {talk_id}")
     try:
         while True:
             message = await web.receive()
             if "text" in message:
                 data = message["text"]
-                delivered = False
                 logger.info(f"Processing text message from {username} to {talk_id}")
-                if talk_id in active_connections:
-                    try:
-                        await active_connections[talk_id].send_text(
-                            f"{username}:{data}"
-                        )
-                        delivered = True
-                        logger.info(
-                            f"Delivered message from {username} -> {talk_id}: {data}"
-                        )
-                    except Exception:
-                        pass
+                if await broker.publish(talk_id, f"{username}:{data}"):
+                    logger.info(
+                        f"Published message from {username} -> {talk_id}: {data}"
+                    )
                 messages = Messaging(
                     user_id=user_id,
-                    receiver_id=talk_id,
+                    receiver=tap.username,
                     username=username_from_token,
                     message=data,
                     time_of_chat=datetime.now(timezone.utc),
-                    delivered=delivered,
+                    delivered=False,
                 )
                 db.add(messages)
+                await db.flush()
+                await record_message(db, messages)
                 await db.commit()
                 await db.refresh(messages)
                 logger.debug(
@@ -111,31 +106,26 @@ async def chatterbox(
 
             if "bytes" in message:
                 mata = message["bytes"]
-                delivered = False
                 logger.debug(f"Processing binary data from {username} to {talk_id}")
-                if talk_id in active_connections:
-                    try:
-                        await active_connections[talk_id].send_bytes(mata)
-                        delivered = True
-                        logger.info(f"Delivered image from {username} -> {talk_id}")
-                    except Exception:
-                        pass
+                if await broker.publish(talk_id, mata):
+                    logger.info(f"Published image from {username} -> {talk_id}")
                 pictures = Messaging(
                     user_id=user_id,
-                    receiver_id=talk_id,
+                    receiver=tap.username,
                     username=username_from_token,
                     pics=mata,
                     time_of_chat=datetime.now(timezone.utc),
-                    delivered=delivered,
+                    delivered=False,
                 )
                 db.add(pictures)
+                await db.flush()
+                await record_message(db, pictures)
                 await db.commit()
                 await db.refresh(pictures)
                 logger.debug(
                     f"Stored image in DB (ID: {pictures.id}) from {username} -> {talk_id}"
                 )
     except WebSocketDisconnect:
-        await disconnect(user_id)
         logger.info(f"{username} disconnected")
         send_email_name.apply_async(
             kwargs={
@@ -146,6 +136,7 @@ async def chatterbox(
             countdown=600,
         )
     finally:
+        await disconnect(user_id, web)
         await web.close()
         await db.close()
         logger.info(f"WebSocket and DB closed for {username} ({user_id})")
@@ -1,5 +1,13 @@
 from app.core.celery_config import celery_app
-from app.core.scheduler import execute_task_async, done_task_async
+from app.core.scheduler import (
+    execute_task_async,
+    done_task_async,
+    reconcile_reactions_async,
+    hot_score_async,
+    image_variants_sync,
+    collect_orphan_images_async,
+    flush_counters_async,
+)
 from app.utils.celery_utils import run_async
 
 
@@ -11,3 +19,28 @@ def execute_task():
 @celery_app.task
 def done_task():
     run_async(done_task_async())
+
+
+@celery_app.task
+def reconcile_reactions():
+    run_async(reconcile_reactions_async())
+
+
+@celery_app.task
+def refresh_hot_scores():
+    run_async(hot_score_async())
+
+
+@celery_app.task(name="app.task.image_variants")
+def generate_image_variants(urls: list[str]):
+    image_variants_sync(urls)
+
+
+@celery_app.task
+def collect_orphan_images():
+    return run_async(collect_orphan_images_async())
+
+
+@celery_app.task
+def flush_counters():
+    run_async(flush_counters_async())
@@ -35,5 +35,21 @@ celery_app.conf.update(
             "task": "app.core.celery_app.done_task",
             "schedule": 30.0,
         },
+        "reconcile-reaction-counters": {
+            "task": "app.core.celery_app.reconcile_reactions",
+            "schedule": 3600.0,
+        },
+        "refresh-hot-scores": {
+            "task": "app.core.celery_app.refresh_hot_scores",
+            "schedule": 300.0,
+        },
+        "flush-buffered-counters": {
+            "task": "app.core.celery_app.flush_counters",
+            "schedule": 10.0,
+        },
+        "collect-orphan-images": {
+            "task": "app.core.celery_app.collect_orphan_images",
+            "schedule": 86400.0,
+        },
     },
 )
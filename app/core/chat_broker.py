@@ -0,0 +1,140 @@
+from fastapi import WebSocket
+from app.core.config import settings
+from app.core.redis_config import async_redis_client
+from app.log.logger import get_loggers
+from typing import Dict
+import asyncio
+
+logger = get_loggers("chat_broker")
+
+TEXT_FRAME = b"t"
+BYTES_FRAME = b"b"
+
+
+def channel_of(user_id: int) -> str:
+    return f"{settings.CHAT_CHANNEL_PREFIX}:{user_id}"
+
+
+def encode_frame(data: str | bytes) -> bytes:
+    if isinstance(data, str):
+        return TEXT_FRAME + data.encode()
+    return BYTES_FRAME + data
+
+
+async def send_frame(web: WebSocket, frame: bytes):
+    if frame[:1] == TEXT_FRAME:
+        await web.send_text(frame[1:].decode())
+    else:
+        await web.send_bytes(frame[1:])
+
+
+class Connection:
+    def __init__(self, web: WebSocket):
+        self.web = web
+        self.outbox: asyncio.Queue = asyncio.Queue(maxsize=settings.CHAT_SEND_QUEUE)
+        self.sender = None
+
+
+class ChatBroker:
+    def __init__(self, client=async_redis_client):
+        self.client = client
+        self.connections: Dict[int, Connection] = {}
+        self.pubsub = None
+        self.listener = None
+
+    async def register(self, user_id: int, web: WebSocket):
+        previous = self.connections.get(user_id)
+        if previous is not None:
+            await self.unregister(user_id, previous.web)
+        connection = Connection(web)
+        connection.sender = asyncio.create_task(self.drain(user_id, connection))
+        self.connections[user_id] = connection
+        try:
+            if self.pubsub is None:
+                self.pubsub = self.client.pubsub()
+            await self.pubsub.subscribe(channel_of(user_id))
+            if self.listener is None or self.listener.done():
+                self.listener = asyncio.create_task(self.listen())
+        except Exception as e:
+            logger.warning(
+                f"Chat broker unavailable, user {user_id} is local only: {e}"
+            )
+
+    async def unregister(self, user_id: int, web: WebSocket):
+        connection = self.connections.get(user_id)
+        if connection is None or connection.web is not web:
+            return
+        del self.connections[user_id]
+        if connection.sender is not asyncio.current_task():
+            connection.sender.cancel()
+        try:
+            if self.pubsub is not None:
+                await self.pubsub.unsubscribe(channel_of(user_id))
+        except Exception as e:
+            logger.warning(f"Chat broker unsubscribe failed for user {user_id}: {e}")
+
+    async def drop(self, user_id: int, connection: Connection, reason):
+        logger.info(f"Dropping chat socket for user {user_id}: {reason}")
+        await self.unregister(user_id, connection.web)
+        try:
+            await connection.web.close(code=1011)
+        except Exception:
+            pass
+
+    async def publish(self, user_id: int, data: str | bytes) -> bool:
+        frame = encode_frame(data)
+        try:
+            return await self.client.publish(channel_of(user_id), frame) > 0
+        except Exception as e:
+            logger.warning(f"Chat broker unavailable, delivering locally: {e}")
+        return await self.deliver(user_id, frame)
+
+    async def deliver(self, user_id: int, frame: bytes) -> bool:
+        connection = self.connections.get(user_id)
+        if connection is None:
+            return False
+        try:
+            connection.outbox.put_nowait(frame)
+        except asyncio.QueueFull:
+            await self.drop(user_id, connection, "send queue full")
+            return False
+        return True
+
+    async def drain(self, user_id: int, connection: Connection):
+        while True:
+            frame = await connection.outbox.get()
+            try:
+                await asyncio.wait_for(
+                    send_frame(connection.web, frame), settings.CHAT_SEND_TIMEOUT
+                )
+            except asyncio.CancelledError:
+                raise
+            except asyncio.TimeoutError:
+                await self.drop(user_id, connection, "send timed out")
+                return
+            except Exception as e:
+                await self.drop(user_id, connection, e)
+                return
+
+    async def listen(self):
+        prefix = f"{settings.CHAT_CHANNEL_PREFIX}:"
+        while self.connections:
+            try:
+                message = await self.pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=1.0
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Chat broker listener error: {e}")
+                await asyncio.sleep(1)
+                continue
+            if not message or message.get("type") != "message":
+                continue
+            channel = message["channel"]
+            if isinstance(channel, bytes):
+                channel = channel.decode()
+            await self.deliver(int(channel.removeprefix(prefix)), message["data"])
+
+
+broker = ChatBroker()
@@ -15,6 +15,29 @@ class SETTINGS(BaseSettings):
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
     DEBUG: bool = False
+    FEED_CACHE_TTL: int = 30
+    PAGINATION_COUNT_STRATEGY: str = "exact"
+    PAGINATION_COUNT_TTL: int = 60
+    BULK_DELETE_BATCH_SIZE: int = 1000
+    COUNTER_WRITE_BEHIND: bool = False
+    COUNTER_FLUSH_BATCH_SIZE: int = 500
+    UPLOAD_MAX_BYTES: int = 10 * 1024 * 1024
+    UPLOAD_CHUNK_SIZE: int = 64 * 1024
+    UPLOAD_ALLOWED_TYPES: list[str] = [
+        "image/jpeg",
+        "image/png",
+        "image/gif",
+        "image/webp",
+    ]
+    IMAGE_GC_BATCH_SIZE: int = 500
+    IMAGE_GC_PAUSE_SECONDS: float = 0.5
+    IMAGE_GC_GRACE_SECONDS: int = 3600
+    IMAGE_CACHE_CONTROL: str = "public, max-age=31536000, immutable"
+    IMAGE_SENDFILE_MODE: str | None = None
+    IMAGE_ACCEL_PREFIX: str = "/_protected/images"
+    CHAT_CHANNEL_PREFIX: str = "chat:user"
+    CHAT_SEND_QUEUE: int = 100
+    CHAT_SEND_TIMEOUT: float = 5.0
     model_config = {"env_file": ".env"}
 
 
@@ -0,0 +1,16 @@
+from app.core.config import settings
+import redis
+import redis.asyncio as aioredis
+
+
+redis_url = settings.REDIS_URL
+if redis_url.startswith("rediss://"):
+    redis_client = redis.from_url(
+        redis_url,
+        ssl_cert_reqs=None,
+        decode_responses=True,
+    )
+    async_redis_client = aioredis.from_url(redis_url, ssl_cert_reqs=None)
+else:
+    redis_client = redis.from_url(redis_url, decode_responses=True)
+    async_redis_client = aioredis.from_url(redis_url)
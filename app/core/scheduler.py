@@ -1,13 +1,37 @@
 from app.core.celery_config import celery_app
 from app.core.async_config import AsyncSessionLocal
-from app.models_sql import Task
-from sqlalchemy import select, or_
-from datetime import datetime, timezone
+from app.models_sql import (
+    Task,
+    Blog,
+    Comment,
+    React,
+    ReactionType,
+    User,
+    Group,
+    Messaging,
+    ImageBlob,
+)
+from sqlalchemy import select, or_, update, func, delete, exists
+from datetime import datetime, timezone, timedelta
+import asyncio
 import os
+import time
 from dotenv import load_dotenv
 import requests
 from sqlalchemy.orm import selectinload
 from app.log.logger import get_loggers
+from app.services.reaction_service import count_reactions, type_column
+from app.services.counter_service import drain, restore, increment, pending
+from app.services.share_service import count_shares
+from app.utils.feed_cache import invalidate_feeds
+from app.utils.images import (
+    VARIANT_DIR,
+    render_variants,
+    image_urls,
+    iter_files,
+    variant_source_stem,
+)
+from app.core.config import settings
 
 load_dotenv()
 API_KEY = os.getenv("SENDGRID_API_KEY")
@@ -15,6 +39,9 @@ SENDER = os.getenv("SENDGRID_SENDER")
 
 logger = get_loggers("celery")
 
+HOT_GRAVITY = 1.5
+HOT_WINDOW_DAYS = 14
+
 
 @celery_app.task(name="app.task.send_email", queue="email")
 def send_email_name(subject: str, body: str, to_email: str):
@@ -104,3 +131,233 @@ async def done_task_async():
             print(f"exception, {e}")
             await db.rollback()
             logger.warning("Database rollback executed for accomplished tasks")
+
+
+async def reconcile_reactions_async(batch_size: int = 500):
+    targets = ((Blog, React.blog_id), (Comment, React.comment_id))
+    async with AsyncSessionLocal() as db:
+        for model, key_column in targets:
+            repaired = 0
+            last_id = 0
+            try:
+                while True:
+                    rows = (
+                        (
+                            await db.execute(
+                                select(model)
+                                .where(model.id > last_id)
+                                .order_by(model.id)
+                                .limit(batch_size)
+                            )
+                        )
+                        .scalars()
+                        .all()
+                    )
+                    if not rows:
+                        break
+                    last_id = rows[-1].id
+                    counts = await count_reactions(
+                        db, key_column, [row.id for row in rows]
+                    )
+                    shares = (
+                        await count_shares(db, [row.id for row in rows])
+                        if model is Blog
+                        else None
+                    )
+                    buffered = await pending(model, [row.id for row in rows])
+                    for row in rows:
+                        actual = counts[row.id]
+                        expected = {"reacts_count": sum(actual.values())}
+                        for rtype in ReactionType:
+                            expected[type_column(rtype)] = actual.get(rtype.value, 0)
+                        if shares is not None:
+                            expected["share_count"] = shares.get(row.id, 0)
+                        for column, value in expected.items():
+                            value = max(
+                                value - buffered.get(row.id, {}).get(column, 0), 0
+                            )
+                            if (getattr(row, column) or 0) != value:
+                                setattr(row, column, value)
+                                repaired += 1
+                    await db.commit()
+                logger.info(
+                    f"Counters reconciled for {model.__tablename__}, {repaired} fields repaired"
+                )
+            except Exception:
+                await db.rollback()
+                logger.exception(
+                    f"Database rollback executed while reconciling {model.__tablename__}"
+                )
+
+
+async def hot_score_async():
+    async with AsyncSessionLocal() as db:
+        try:
+            now = datetime.now(timezone.utc)
+            cutoff = now - timedelta(days=HOT_WINDOW_DAYS)
+            age_hours = func.extract("epoch", now - Blog.time_of_post) / 3600
+            engagement = (
+                func.coalesce(Blog.comments_count, 0)
+                + func.coalesce(Blog.share_count, 0)
+                + func.coalesce(Blog.reacts_count, 0)
+            )
+            fresh = await db.execute(
+                update(Blog)
+                .where(Blog.time_of_post >= cutoff)
+                .values(
+                    hot_score=(engagement + 1)
+                    / func.power(func.greatest(age_hours, 0) + 2, HOT_GRAVITY)
+                )
+            )
+            stale = await db.execute(
+                update(Blog)
+                .where(Blog.time_of_post < cutoff, Blog.hot_score != 0)
+                .values(hot_score=0)
+            )
+            await db.commit()
+            logger.info(
+                f"Hot scores refreshed for {fresh.rowcount} blogs, {stale.rowcount} expired"
+            )
+        except Exception:
+            await db.rollback()
+            logger.exception("Database rollback executed while refreshing hot scores")
+
+
+def image_variants_sync(urls: list[str]):
+    sources = [url.lstrip("/") for url in urls if url]
+    sources = [source for source in sources if os.path.isfile(source)]
+    if not sources:
+        return
+    started = time.perf_counter()
+    written = 0
+    for source in sources:
+        try:
+            written += len(render_variants(source))
+        except Exception as e:
+            logger.error(f"Variant generation failed for {source}: {e}")
+    logger.info(
+        f"Generated {written} image variants for {len(sources)} uploads in {time.perf_counter() - started:.2f}s"
+    )
+
+
+async def referenced_images(db) -> set[str]:
+    referenced = set()
+    sources = [
+        select(User.profile_picture).where(User.profile_picture.isnot(None)),
+        select(Group.profile_picture).where(Group.profile_picture.isnot(None)),
+        select(Messaging.pics).where(
+            Messaging.pics.isnot(None),
+            or_(
+                Messaging.sender_deleted.is_not(True),
+                Messaging.receiver_deleted.is_not(True),
+            ),
+        ),
+        select(Blog.image).where(Blog.image.isnot(None)),
+        select(ImageBlob.url).where(ImageBlob.ref_count > 0),
+    ]
+    for stmt in sources:
+        rows = await db.stream_scalars(
+            stmt.execution_options(yield_per=settings.IMAGE_GC_BATCH_SIZE)
+        )
+        async for value in rows:
+            for url in image_urls(value):
+                referenced.add(os.path.normpath(url.lstrip("/")))
+    return referenced
+
+
+async def remove_orphan(db, path: str, cutoff: float) -> bool:
+    digest = os.path.splitext(os.path.basename(path))[0]
+    try:
+        claimed = (
+            await db.execute(
+                delete(ImageBlob)
+                .where(ImageBlob.digest == digest, ImageBlob.ref_count <= 0)
+                .returning(ImageBlob.id)
+            )
+        ).first()
+        if claimed is None:
+            tracked = select(exists().where(ImageBlob.digest == digest))
+            if (await db.execute(tracked)).scalar():
+                await db.rollback()
+                return False
+        if os.stat(path).st_mtime > cutoff:
+            await db.rollback()
+            return False
+        os.remove(path)
+    except Exception:
+        await db.rollback()
+        raise
+    await db.commit()
+    return True
+
+
+async def collect_orphan_images_async(root: str = "images"):
+    started = time.perf_counter()
+    report = {"scanned": 0, "kept": 0, "removed": 0, "freed_bytes": 0, "failed": 0}
+    async with AsyncSessionLocal() as db:
+        try:
+            referenced = await referenced_images(db)
+            await db.commit()
+        except Exception:
+            logger.exception("Image collection aborted, referenced urls unavailable")
+            return report
+        stems = {os.path.splitext(os.path.basename(path))[0] for path in referenced}
+        cutoff = time.time() - settings.IMAGE_GC_GRACE_SECONDS
+        for path, stat in iter_files(root):
+            report["scanned"] += 1
+            path = os.path.normpath(path)
+            if stat.st_mtime > cutoff:
+                report["kept"] += 1
+                continue
+            variant = os.path.dirname(path) == VARIANT_DIR
+            if variant:
+                orphan = variant_source_stem(path) not in stems
+            else:
+                orphan = path not in referenced
+            if not orphan:
+                report["kept"] += 1
+                continue
+            try:
+                if variant:
+                    os.remove(path)
+                elif not await remove_orphan(db, path, cutoff):
+                    report["kept"] += 1
+                    continue
+            except Exception as e:
+                report["failed"] += 1
+                logger.warning(f"Could not remove orphaned image {path}: {e}")
+                continue
+            report["removed"] += 1
+            report["freed_bytes"] += stat.st_size
+            if report["removed"] % settings.IMAGE_GC_BATCH_SIZE == 0:
+                await asyncio.sleep(settings.IMAGE_GC_PAUSE_SECONDS)
+    report["seconds"] = round(time.perf_counter() - started, 2)
+    logger.info(f"Orphaned image collection report: {report}")
+    return report
+
+
+async def flush_counters_async(max_batches: int = 20):
+    flushed = 0
+    for _ in range(max_batches):
+        try:
+            drained = await drain(settings.COUNTER_FLUSH_BATCH_SIZE)
+        except Exception as e:
+            logger.warning(f"Counter buffer unavailable, flush skipped: {e}")
+            break
+        if not drained:
+            break
+        drained.sort(key=lambda entry: (entry[0].__tablename__, entry[1]))
+        async with AsyncSessionLocal() as db:
+            try:
+                for model, target_id, deltas in drained:
+                    await increment(db, model, target_id, deltas)
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                logger.exception("Database rollback executed while flushing counters")
+                await restore(db, drained)
+                break
+        flushed += len(drained)
+    if flushed:
+        await invalidate_feeds()
+        logger.info(f"Flushed buffered counters for {flushed} rows")
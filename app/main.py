@@ -25,7 +25,7 @@ from app.exceptions import (
     make_http_exception_handler,
     make_validation_exception_handler,
 )
-from fastapi.staticfiles import StaticFiles
+from app.utils.static import ImageFiles
 from dotenv import load_dotenv
 
 app = FastAPI(title="club_house", version="1.0")
@@ -40,7 +40,7 @@ app.add_middleware(
 )
 
 
-app.mount("/images", StaticFiles(directory="images"), name="images")
+app.mount("/images", ImageFiles(directory="images"), name="images")
 
 
 @app.middleware("http")
@@ -7,10 +7,12 @@ from sqlalchemy import (
     Float,
     ForeignKey,
     UniqueConstraint,
+    Index,
     Enum as SQLEnum,
     Date,
     Table,
     Text,
+    func,
 )
 from enum import Enum
 from app.core.declarative import Base
@@ -35,6 +37,27 @@ class User(Base):
     phone_number = Column(Float)
     address = Column(String)
     profile_picture = Column(String, nullable=True)
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=current_utc_time,
+        onupdate=current_utc_time,
+        server_default=func.now(),
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_users_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_users_username_trgm",
+            "username",
+            postgresql_using="gin",
+            postgresql_ops={"username": "gin_trgm_ops"},
+        ),
+    )
 
     tasks = relationship("Task", back_populates="user")
     group_tasks = relationship("GroupTask", back_populates="user")
@@ -63,9 +86,52 @@ class Messaging(Base):
     sender_deleted = Column(Boolean, default=False)
     receiver_deleted = Column(Boolean, default=False)
     time_of_chat = Column(DateTime(timezone=True), default=current_utc_time)
+    conversation_id = Column(
+        Integer,
+        ForeignKey(
+            "conversations.id",
+            name="fk_messages_conversation_id",
+            ondelete="SET NULL",
+            use_alter=True,
+        ),
+        nullable=True,
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_messages_conversation_time",
+            conversation_id,
+            time_of_chat.desc(),
+            id,
+        ),
+    )
+
     user = relationship("User", back_populates="messages")
 
 
+class Conversation(Base):
+    __tablename__ = "conversations"
+    id = Column(Integer, primary_key=True, index=True)
+    user_a = Column(String, nullable=False)
+    user_b = Column(String, nullable=False)
+    last_message_id = Column(
+        Integer, ForeignKey("messages.id", ondelete="SET NULL"), nullable=True
+    )
+    last_message_at = Column(DateTime(timezone=True), default=current_utc_time)
+    unread_a = Column(Integer, nullable=False, default=0, server_default="0")
+    unread_b = Column(Integer, nullable=False, default=0, server_default="0")
+    deleted_a = Column(Boolean, nullable=False, default=False, server_default="false")
+    deleted_b = Column(Boolean, nullable=False, default=False, server_default="false")
+
+    __table_args__ = (
+        UniqueConstraint("user_a", "user_b", name="unique_conversation_pair"),
+        Index("ix_conversations_a_recent", "user_a", "last_message_at", "id"),
+        Index("ix_conversations_b_recent", "user_b", "last_message_at", "id"),
+    )
+
+    last_message = relationship("Messaging", foreign_keys=[last_message_id])
+
+
 class Task(Base):
     __tablename__ = "tasks"
     id = Column(Integer, primary_key=True, index=True)
@@ -78,6 +144,12 @@ class Task(Base):
     complete = Column(Boolean, default=False)
     status = Column(String, default="pending")
     time_of_initial_prep = Column(DateTime(timezone=True), default=current_utc_time)
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=current_utc_time,
+        onupdate=current_utc_time,
+        server_default=func.now(),
+    )
 
     user = relationship("User", back_populates="tasks")
 
@@ -126,6 +198,12 @@ class GroupTask(Base):
     status = Column(String, default="pending")
     opinion_count = Column(Integer, default=0)
     time_of_initial_prep = Column(DateTime(timezone=True), default=current_utc_time)
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=current_utc_time,
+        onupdate=current_utc_time,
+        server_default=func.now(),
+    )
 
     user = relationship("User", back_populates="group_tasks")
     group = relationship("Group", back_populates="group_tasks")
@@ -156,6 +234,12 @@ class Participant(Base):
     amount_levied = Column(Float, default=0)
     paid = Column(Boolean, default=False)
     time_of_assignment = Column(DateTime(timezone=True), default=current_utc_time)
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=current_utc_time,
+        onupdate=current_utc_time,
+        server_default=func.now(),
+    )
 
     group = relationship("Group", back_populates="participants")
     group_tasks = relationship(
@@ -181,6 +265,12 @@ class GroupAdmin(Base):
         Integer, ForeignKey("groups.id", ondelete="CASCADE"), nullable=False
     )
     role = Column(String, default="admin")
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=current_utc_time,
+        onupdate=current_utc_time,
+        server_default=func.now(),
+    )
 
     __table_args__ = (
         UniqueConstraint("user_id", "group_id", name="unique_group_admin"),
@@ -266,10 +356,27 @@ class Blog(Base):
     details = Column(Text)
     comments_count = Column(Integer, default=0)
     reacts_count = Column(Integer, default=0)
+    like_count = Column(Integer, default=0, server_default="0")
+    love_count = Column(Integer, default=0, server_default="0")
+    wow_count = Column(Integer, default=0, server_default="0")
+    haha_count = Column(Integer, default=0, server_default="0")
+    sad_count = Column(Integer, default=0, server_default="0")
+    angry_count = Column(Integer, default=0, server_default="0")
     share_count = Column(Integer, default=0)
+    hot_score = Column(Float, default=0, server_default="0")
     user_id = Column(Integer, ForeignKey("users.id"))
     time_of_post = Column(DateTime(timezone=True), default=datetime.now(timezone.utc))
 
+    __table_args__ = (
+        Index(
+            "ix_blogs_target_trgm",
+            "target",
+            postgresql_using="gin",
+            postgresql_ops={"target": "gin_trgm_ops"},
+        ),
+        Index("ix_blogs_hot_score", "hot_score", "id"),
+    )
+
     comments = relationship(
         "Comment", back_populates="blog", cascade="all, delete-orphan"
     )
@@ -284,9 +391,20 @@ class Comment(Base):
     content = Column(String)
     blog_id = Column(Integer, ForeignKey("blogs.id", ondelete="CASCADE"))
     user_id = Column(Integer, ForeignKey("users.id"))
-    reacts_count = Column(Integer, default=0)
+    reacts_count = Column(Integer, default=0, server_default="0")
+    like_count = Column(Integer, default=0, server_default="0")
+    love_count = Column(Integer, default=0, server_default="0")
+    wow_count = Column(Integer, default=0, server_default="0")
+    haha_count = Column(Integer, default=0, server_default="0")
+    sad_count = Column(Integer, default=0, server_default="0")
+    angry_count = Column(Integer, default=0, server_default="0")
     time_of_post = Column(DateTime(timezone=True), default=datetime.now(timezone.utc))
 
+    __table_args__ = (
+        Index("ix_comments_blog_time", "blog_id", "time_of_post", "id"),
+        Index("ix_comments_blog_reacts", "blog_id", "reacts_count", "id"),
+    )
+
     blog = relationship("Blog", back_populates="comments")
     user = relationship("User", back_populates="comments")
     react = relationship(
@@ -302,6 +420,12 @@ class Opinion(Base):
     group_id = Column(Integer, ForeignKey("groups.id", ondelete="CASCADE"))
     task_id = Column(Integer, ForeignKey("group_tasks.id", ondelete="CASCADE"))
     vote_count = Column(Integer, default=0)
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=current_utc_time,
+        onupdate=current_utc_time,
+        server_default=func.now(),
+    )
 
     task = relationship("GroupTask", back_populates="opinions")
     user = relationship("User", back_populates="opinions")
@@ -367,8 +491,8 @@ class React(Base):
 
     __table_args__ = (
         UniqueConstraint("user_id", "comment_id", name="unique_comment_react"),
+        UniqueConstraint("user_id", "blog_id", name="unique_blog_react"),
     )
-    __table_args__ = (UniqueConstraint("user_id", "blog_id", name="unique_blog_react"),)
     comment = relationship("Comment", back_populates="react")
     blog = relationship("Blog", back_populates="react")
     user = relationship("User", back_populates="reacts")
@@ -390,6 +514,22 @@ class Share(Base):
     content = Column(String)
     type = Column(SQLEnum(ShareType), nullable=True)
     time_of_share = Column(DateTime(timezone=True), default=current_utc_time)
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=current_utc_time,
+        onupdate=current_utc_time,
+        server_default=func.now(),
+    )
 
     user = relationship("User", back_populates="shares")
     blog = relationship("Blog", back_populates="shares")
+
+
+class ImageBlob(Base):
+    __tablename__ = "image_blobs"
+    id = Column(Integer, primary_key=True, index=True)
+    digest = Column(String(64), unique=True, nullable=False)
+    url = Column(String, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0, server_default="0")
+    created_at = Column(DateTime(timezone=True), default=current_utc_time)
+    updated_at = Column(DateTime(timezone=True), default=current_utc_time)
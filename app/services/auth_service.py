@@ -8,16 +8,14 @@ from app.auth.auth_jwt import (
     create_refresh_tokens,
 )
 from sqlalchemy.exc import IntegrityError
-from werkzeug.utils import secure_filename
 from app.auth.verify_jwt import decode_token
 from datetime import timedelta
-import shutil, uuid, os
 from app.log.logger import get_loggers
 from app.core.scheduler import send_email_name
+from app.services.upload_service import save_upload, acquire_images
 from email_validator import validate_email, EmailNotValidError
 
 logger = get_loggers("auth")
-os.makedirs("images", exist_ok=True)
 
 
 async def register(
@@ -75,11 +73,7 @@ async def register(
             status_code=400, detail="confirm password does not match password"
         )
     if profile_picture is not None:
-        filename = f"{uuid.uuid4()}_{secure_filename(profile_picture.filename)}"
-        file_path = os.path.join("images", filename)
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(profile_picture.file, buffer)
-        file_url = f"/images/{filename}"
+        file_url = await save_upload(profile_picture)
     else:
         file_url = None
     password = str(password)
@@ -96,6 +90,7 @@ async def register(
     logger.info(f"Registration attempt for username: {username}, email: {email}")
     try:
         db.add(new_user)
+        await acquire_images(db, [file_url])
         await db.commit()
         await db.refresh(new_user)
         send_email_name.delay(
@@ -1,46 +1,112 @@
 from fastapi import HTTPException
-from werkzeug.utils import secure_filename
-import os, shutil, uuid
-from sqlalchemy import select, func
+from sqlalchemy import select, func, update, delete
 from app.api.v1.models import (
     Blogger,
+    BlogListing,
     PaginatedMetadata,
-    PaginatedResponse,
     StandardResponse,
-    ReactionsSummary,
 )
 from sqlalchemy.exc import IntegrityError
-from app.models_sql import Blog, User, React
+from app.models_sql import Blog, User, Comment, Share
+from app.core.config import settings
+from app.services.reaction_service import summary_of
+from app.services.counter_service import merge_pending
 from datetime import datetime, timezone
 from sqlalchemy.orm import selectinload
 import json
 from app.log.logger import get_loggers
+from app.utils.pagination import (
+    encode_cursor,
+    decode_cursor,
+    keyset_lt,
+    paginate,
+)
+from app.utils.search import trigram_match, trigram_rank
+from app.utils.feed_cache import (
+    page_key,
+    get_page,
+    set_page,
+    invalidate_feeds,
+    feed_generation,
+)
+from app.utils.etag import change_markers
+from app.services.upload_service import (
+    save_uploads,
+    acquire_images,
+    release_images,
+)
+from app.utils.images import image_urls
 from sqlalchemy.ext.asyncio import AsyncSession
 
 logger = get_loggers("blogs")
-os.makedirs("images", exist_ok=True)
 
 
-async def react_summary(db: AsyncSession, blog_id) -> ReactionsSummary:
-    react_count = (
-        await db.execute(
-            select(React.type, func.count(React.id))
-            .where(React.blog_id == blog_id)
-            .group_by(React.type)
-            .order_by(React.type)
+LISTING_COLUMNS = (
+    Blog.id,
+    Blog.image,
+    Blog.target,
+    Blog.details,
+    Blog.reacts_count,
+    Blog.like_count,
+    Blog.love_count,
+    Blog.wow_count,
+    Blog.haha_count,
+    Blog.sad_count,
+    Blog.angry_count,
+    Blog.comments_count,
+    Blog.share_count,
+    Blog.hot_score,
+    Blog.time_of_post,
+    User.name,
+    User.profile_picture,
+)
+
+
+async def feed_version(page, limit, cursor):
+    generation = await feed_generation()
+    if generation is None:
+        return None
+    return (generation, page, limit, cursor)
+
+
+async def blog_version(db, blog_id):
+    stmt = (
+        select(
+            *[
+                column
+                for column in LISTING_COLUMNS
+                if column.key not in ("image", "target", "details", "hot_score")
+            ],
+            change_markers(
+                Comment,
+                Comment.blog_id == blog_id,
+                extra=[func.max(Comment.time_of_post), func.sum(Comment.reacts_count)],
+            ),
         )
-    ).all()
-    summary = {
-        rtype.name if hasattr(rtype, "name") else rtype: react
-        for rtype, react in react_count
-    }
-    return ReactionsSummary(
-        like=summary.get("like", 0),
-        love=summary.get("love", 0),
-        wow=summary.get("wow", 0),
-        haha=summary.get("haha", 0),
-        sad=summary.get("sad", 0),
-        angry=summary.get("angry", 0),
+        .join(User, User.id == Blog.user_id)
+        .where(Blog.id == blog_id, User.is_active == True)
+    )
+    row = (await db.execute(stmt)).first()
+    return tuple(row) if row else (blog_id, None)
+
+
+def listing_query():
+    return select(*LISTING_COLUMNS).join(User, User.id == Blog.user_id)
+
+
+def listing_of(row) -> BlogListing:
+    return BlogListing(
+        id=row.id,
+        profile_picture=[row.profile_picture] if row.profile_picture else [],
+        name=[row.name] if row.name else [],
+        image=row.image,
+        target=row.target,
+        details=row.details,
+        reactions=[summary_of(row)],
+        reacts_count=row.reacts_count,
+        comments_count=row.comments_count,
+        share_count=row.share_count,
+        time_of_post=row.time_of_post,
     )
 
 
@@ -59,14 +125,7 @@ async def create_blog(db, payload, target, image, details):
             raise HTTPException(
                 status_code=400, detail=f"maximum number of images allowed is {max}"
             )
-        uploaded_file = []
-        for file in image:
-            filename = f"{uuid.uuid4()}_{secure_filename(file.filename)}"
-            file_path = os.path.join("images", filename)
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
-            file_url = f"/images/{filename}"
-            uploaded_file.append(file_url)
+        uploaded_file = await save_uploads(image)
         image = json.dumps(uploaded_file)
     else:
         image = None
@@ -79,56 +138,61 @@ async def create_blog(db, payload, target, image, details):
     )
     try:
         db.add(blogs)
+        await acquire_images(db, image_urls(image))
         await db.commit()
         await db.refresh(blogs)
     except IntegrityError:
         await db.rollback()
         logger.error(f"Blog post creation failed for user: {username}")
         raise HTTPException(status_code=500, detail="internal server error")
+    await invalidate_feeds()
     logger.info(f"Blog post created successfully for user: {username}")
     return {"message": "post successful"}
 
 
-async def retrieve_all(page, limit, db, payload):
+async def retrieve_all(page, limit, db, payload, cursor=None):
     username = payload.get("sub")
     if not username:
         logger.warning(f"Unauthorized access attempt , username:{username}")
         raise HTTPException(status_code=403, detail="unauthorized access")
-    offset = (page - 1) * limit
+    cache_key = await page_key("view", page, limit, cursor or "")
+    cached_page = await get_page(cache_key)
+    if cached_page:
+        logger.info(f"Cache hit for blog feed with key: {cache_key}")
+        return StandardResponse(**cached_page)
+    keys = (Blog.time_of_post, Blog.id)
     stmt = (
-        select(Blog)
-        .join(User, User.id == Blog.user_id)
-        .options(selectinload(Blog.user), selectinload(Blog.comments))
+        listing_query()
         .where(User.is_active == True)
-        .order_by(
-            Blog.time_of_post.desc(),
-            (Blog.comments_count + Blog.share_count + Blog.reacts_count).desc(),
-        )
+        .order_by(*(key.desc() for key in keys))
+    )
+    if cursor:
+        stmt = stmt.where(keyset_lt(keys, decode_cursor(cursor, "feed")))
+    blogs, pagination = await paginate(
+        db,
+        stmt,
+        page,
+        limit,
+        strategy="has_more" if cursor else None,
+        scalars=False,
+        offset=0 if cursor else None,
     )
-    total = (
-        await db.execute(select(func.count()).select_from(stmt.subquery()))
-    ).scalar() or 0
-    logger.info("Total blogs found for '%s': %d", username, total)
-    result = await db.scalars(stmt.offset(offset).limit(limit))
-    blogs = result.all()
+    logger.info("Total blogs found for '%s': %s", username, pagination.total)
     if not blogs:
         raise HTTPException(status_code=404, detail="No blogs found")
+    if pagination.has_more:
+        pagination.next_cursor = encode_cursor(
+            "feed", (blogs[-1].time_of_post, blogs[-1].id)
+        )
     logger.info("Number of blogs retrieved on this page: %d", len(blogs))
-    items = []
-    for blog in blogs:
-        blog_data = Blogger.model_validate(blog)
-        blog_data.profile_picture = blog.user.profile_picture
-        blog_data.name = blog.user.name
-        blog_data.reactions = await react_summary(db, blog.id)
-        items.append(blog_data)
-    data = PaginatedMetadata[Blogger](
-        items=items,
-        pagination=PaginatedResponse(page=page, limit=limit, total=total),
-    )
+    items = await merge_pending(Blog, [listing_of(blog) for blog in blogs])
+    data = PaginatedMetadata[BlogListing](items=items, pagination=pagination)
     logger.info("Paginated data prepared successfully for '%s'", username)
-    return StandardResponse(
+    response = StandardResponse(
         status="success", message="below lies all your expressions", data=data
     )
+    await set_page(cache_key, response)
+    return response
 
 
 async def filter(
@@ -143,99 +207,110 @@ async def filter(
     if not username:
         logger.warning(f"Unauthorized access attempt , username:{username}")
         raise HTTPException(status_code=403, detail="unauthorized access")
-    offset = (page - 1) * limit
-    stmt = (
-        select(Blog)
-        .join(User, User.id == Blog.user_id)
-        .options(selectinload(Blog.user), selectinload(Blog.comments))
-        .where(User.is_active == True)
-        .order_by(
-            Blog.time_of_post.desc(),
-            (Blog.comments_count + Blog.share_count + Blog.reacts_count).desc(),
-        )
-    )
+    stmt = listing_query().where(User.is_active == True)
+    ranking = []
     if author:
         logger.info(f"Filtering blogs by author: {author}")
-        stmt = stmt.where(Blog.user.has(User.name.ilike(f"%{author}%")))
+        stmt = stmt.where(trigram_match(User.name, author))
+        ranking.append((User.name, author))
     if target:
         logger.info(f"Filtering blogs by target: {target}")
-        stmt = stmt.where(Blog.target.ilike(f"%{target}%"))
-    total = (
-        await db.execute(select(func.count()).select_from(stmt.subquery()))
-    ).scalar() or 0
-    logger.info("Total filtered blogs: %d", total)
-    results = (await db.execute(stmt.offset(offset).limit(limit))).scalars().all()
+        stmt = stmt.where(trigram_match(Blog.target, target))
+        ranking.append((Blog.target, target))
+    if ranking:
+        stmt = stmt.order_by(trigram_rank(*ranking).desc())
+    stmt = stmt.order_by(Blog.time_of_post.desc(), Blog.id.desc())
+    results, pagination = await paginate(db, stmt, page, limit, scalars=False)
+    logger.info("Total filtered blogs: %s", pagination.total)
     logger.info("Number of blogs retrieved on this page: %d", len(results))
-    items = []
-    for blog in results:
-        blog_data = Blogger.model_validate(blog)
-        blog_data.profile_picture = blog.user.profile_picture
-        blog_data.name = blog.user.name
-        blog_data.reactions = await react_summary(db, blog.id)
-        items.append(blog_data)
-    data = PaginatedMetadata[Blogger](
-        items=items,
-        pagination=PaginatedResponse(page=page, limit=limit, total=total),
-    )
+    items = await merge_pending(Blog, [listing_of(blog) for blog in results])
+    data = PaginatedMetadata[BlogListing](items=items, pagination=pagination)
     logger.info("Filtered paginated data prepared successfully for '%s'", username)
     return StandardResponse(
         status="success", message="below lies all your expressions", data=data
     )
 
 
+def trending_keys(sorting):
+    if sorting == "hot":
+        return (Blog.hot_score, Blog.id)
+    score = Blog.comments_count + Blog.share_count + Blog.reacts_count
+    if sorting == "popular":
+        return (
+            score,
+            Blog.comments_count,
+            Blog.share_count,
+            Blog.reacts_count,
+            Blog.id,
+        )
+    return (score, Blog.time_of_post, Blog.id)
+
+
+def trending_values(blog, sorting):
+    if sorting == "hot":
+        return (blog.hot_score, blog.id)
+    score = (blog.comments_count or 0) + (blog.share_count or 0)
+    score += blog.reacts_count or 0
+    if sorting == "popular":
+        return (
+            score,
+            blog.comments_count,
+            blog.share_count,
+            blog.reacts_count,
+            blog.id,
+        )
+    return (score, blog.time_of_post, blog.id)
+
+
 async def view_trending(
     sorting,
     page,
     limit,
     db,
     payload,
+    cursor=None,
 ):
     username = payload.get("sub")
     if not username:
         logger.warning(f"Unauthorized access attempt , username:{username}")
         raise HTTPException(status_code=403, detail="unauthorized access")
-    offset = (page - 1) * limit
+    cache_key = await page_key("discover", sorting, page, limit, cursor or "")
+    cached_page = await get_page(cache_key)
+    if cached_page:
+        logger.info(f"Cache hit for trending blogs with key: {cache_key}")
+        return StandardResponse(**cached_page)
+    logger.info(f"Sorting blogs by {sorting} for user: {username}")
+    keys = trending_keys(sorting)
     stmt = (
-        select(Blog)
-        .join(User, User.id == Blog.user_id)
-        .options(selectinload(Blog.user), selectinload(Blog.comments))
+        listing_query()
         .where(User.is_active == True)
-        .order_by(
-            (Blog.comments_count + Blog.share_count + Blog.reacts_count).desc(),
-        )
+        .order_by(*(key.desc() for key in keys))
     )
-    if sorting == "recent":
-        logger.info(f"Sorting blogs by recent for user: {username}")
-        stmt = stmt.order_by(Blog.time_of_post.desc())
-    if sorting == "popular":
-        logger.info(f"Sorting blogs by popular for user: {username}")
-        stmt = stmt.order_by(
-            Blog.comments_count.desc(),
-            Blog.share_count.desc(),
-            Blog.reacts_count.desc(),
+    if cursor:
+        stmt = stmt.where(keyset_lt(keys, decode_cursor(cursor, sorting)))
+    result, pagination = await paginate(
+        db,
+        stmt,
+        page,
+        limit,
+        strategy="has_more" if cursor else None,
+        scalars=False,
+        offset=0 if cursor else None,
+    )
+    logger.info("Total blogs for '%s': %s", username, pagination.total)
+    if pagination.has_more:
+        pagination.next_cursor = encode_cursor(
+            sorting, trending_values(result[-1], sorting)
         )
-    total = (
-        await db.execute(select(func.count()).select_from(stmt.subquery()))
-    ).scalar() or 0
-    logger.info("Total blogs for '%s': %d", username, total)
-    stmt = stmt.offset(offset).limit(limit)
-    result = (await db.execute(stmt)).scalars().all()
     logger.info("Number of recent blogs retrieved: %d", len(result))
-    items = []
-    for blog in result:
-        blog_data = Blogger.model_validate(blog)
-        blog_data.profile_picture = blog.user.profile_picture
-        blog_data.name = blog.user.name
-        blog_data.reactions = await react_summary(db, blog.id)
-        items.append(blog_data)
-    data = PaginatedMetadata[Blogger](
-        items=items,
-        pagination=PaginatedResponse(page=page, limit=limit, total=total),
-    )
+    items = await merge_pending(Blog, [listing_of(blog) for blog in result])
+    data = PaginatedMetadata[BlogListing](items=items, pagination=pagination)
     logger.info("Recent paginated data prepared successfully for '%s'", username)
-    return StandardResponse(
+    response = StandardResponse(
         status="success", message="below lies all the recent expressions", data=data
     )
+    await set_page(cache_key, response)
+    return response
 
 
 async def fetch_some(
@@ -250,7 +325,10 @@ async def fetch_some(
     stmt = (
         select(Blog)
         .join(User, User.id == Blog.user_id)
-        .options(selectinload(Blog.user), selectinload(Blog.comments))
+        .options(
+            selectinload(Blog.user),
+            selectinload(Blog.comments).selectinload(Comment.user),
+        )
         .where(Blog.id == blog_id, User.is_active == True)
     )
     result = (await db.execute(stmt)).scalar_one_or_none()
@@ -258,9 +336,21 @@ async def fetch_some(
         logger.warning(f"No blog found with id {blog_id} for {username}")
         return StandardResponse(status="failure", message="invalid id")
     data = Blogger.model_validate(result)
-    data.profile_picture = result.user.profile_picture
-    data.name = result.user.name
-    data.reactions = await react_summary(db, data.id)
+    data.profile_picture = (
+        [result.user.profile_picture] if result.user.profile_picture else []
+    )
+    data.name = [result.user.name] if result.user.name else []
+    data.reactions = [summary_of(result)]
+    comments = {comment.id: comment for comment in result.comments}
+    for item in data.comments:
+        author = comments[item.id].user
+        item.profile_picture = (
+            [author.profile_picture] if author.profile_picture else []
+        )
+        item.name = [author.name] if author.name else []
+        item.reactions = [summary_of(comments[item.id])]
+    await merge_pending(Blog, [data])
+    await merge_pending(Comment, data.comments)
     logger.info(f"Successfully retrieved blog with id {blog_id}: {data}")
     return StandardResponse(status="success", message="requested data", data=data)
 
@@ -298,6 +388,7 @@ async def change(
         await db.rollback()
         logger.error(f"Blog update failed for blog id {blog_id} by user {username}")
         raise HTTPException(status_code=500, detail="internal server error")
+    await invalidate_feeds()
     logger.info(f"Blog with id {blog_id} successfully updated by user {username}")
     return {
         "status": "success",
@@ -328,11 +419,13 @@ async def delete_one(blog_id, db, payload):
         return {"status": "no data", "message": "invalid field"}
     try:
         await db.delete(data)
+        await release_images(db, image_urls(data.image))
         await db.commit()
     except IntegrityError:
         await db.rollback()
         logger.error(f"Failed to delete blog with id {blog_id} for user {username}")
         raise HTTPException(status_code=500, detail="internal server error")
+    await invalidate_feeds()
     logger.info(f"Blog with id {blog_id} successfully deleted by user {username}")
     return {
         "status": "success",
@@ -351,18 +444,39 @@ async def clear(db, payload):
     if not user_id:
         logger.warning(f"Unauthorized access attempt , username:{username}")
         raise HTTPException(status_code=403, detail="unauthorized access")
-    stmt = select(Blog).where(Blog.user_id == user_id)
-    data = (await db.execute(stmt)).scalars().all()
-    if not data:
-        logger.warning(f"No blogs found to clear for {username}")
-        return {"message:": "no available data"}
+    stmt = (
+        select(Blog.id, Blog.image)
+        .where(Blog.user_id == user_id)
+        .order_by(Blog.id)
+        .limit(settings.BULK_DELETE_BATCH_SIZE)
+    )
+    cleared = 0
     try:
-        for item in data:
-            await db.delete(item)
-        await db.commit()
+        while batch := (await db.execute(stmt)).all():
+            ids = [row.id for row in batch]
+            await db.execute(
+                update(Share)
+                .where(Share.blog_id.in_(ids))
+                .values(blog_id=None)
+                .execution_options(synchronize_session=False)
+            )
+            await db.execute(
+                delete(Blog)
+                .where(Blog.id.in_(ids))
+                .execution_options(synchronize_session=False)
+            )
+            await release_images(
+                db, [url for row in batch for url in image_urls(row.image)]
+            )
+            await db.commit()
+            cleared += len(ids)
     except IntegrityError:
         logger.error(f"Failed to clear blogs for user {username}")
         await db.rollback()
         raise HTTPException(status_code=500, detail="internal server error")
-    logger.info(f"All blogs successfully cleared for user {username}")
+    if not cleared:
+        logger.warning(f"No blogs found to clear for {username}")
+        return {"message:": "no available data"}
+    await invalidate_feeds()
+    logger.info(f"{cleared} blogs successfully cleared for user {username}")
     return {"message": "data wiped"}
@@ -1,18 +1,24 @@
 from fastapi import HTTPException
 from app.api.v1.models import (
     StandardResponse,
-    PaginatedResponse,
     PaginatedMetadata,
     Commenter,
-    ReactionsSummary,
 )
-from app.models_sql import Comment, Blog, User, React
+from app.models_sql import Comment, Blog, User
+from app.services.reaction_service import summary_of
+from app.services.counter_service import merge_pending, increment
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timezone
-from sqlalchemy import select, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from app.log.logger import get_loggers
+from app.utils.feed_cache import invalidate_feeds
+from app.utils.pagination import (
+    encode_cursor,
+    decode_cursor,
+    keyset_lt,
+    paginate,
+)
 import tracemalloc
 
 tracemalloc.start()
@@ -20,38 +26,11 @@ tracemalloc.start()
 logger = get_loggers("comments")
 
 
-async def react_summary(db: AsyncSession, comment_id) -> ReactionsSummary:
-    counts = (
-        await db.execute(
-            select(React.type, func.count(React.id))
-            .where(React.comment_id == comment_id)
-            .group_by(React.type)
-            .order_by(React.type)
-        )
-    ).all()
-    summary = {
-        rtype.name if hasattr(rtype, "name") else rtype: count
-        for rtype, count in counts
-    }
-    return ReactionsSummary(
-        like=summary.get("like", 0),
-        love=summary.get("love", 0),
-        laugh=summary.get("laugh", 0),
-        angry=summary.get("angry", 0),
-        wow=summary.get("wow", 0),
-        sad=summary.get("sad", 0),
-    )
-
-
 async def c_express(comment, db, payload):
     user_id = payload.get("user_id")
     username = payload.get("sub")
     if not user_id:
         raise HTTPException(status_code=403, detail="Unauthorized access.")
-    target = await db.get(Blog, comment.blog_id)
-    if not target:
-        logger.warning(f"No blog found with ID: {comment.blog_id}")
-        return StandardResponse(status="failure", message="no such blog exists")
     comments = Comment(
         user_id=user_id,
         content=comment.content,
@@ -59,14 +38,19 @@ async def c_express(comment, db, payload):
         time_of_post=datetime.now(timezone.utc),
     )
     try:
+        target = await increment(db, Blog, comment.blog_id, {"comments_count": 1})
+        if not target:
+            await db.rollback()
+            logger.warning(f"No blog found with ID: {comment.blog_id}")
+            return StandardResponse(status="failure", message="no such blog exists")
         db.add(comments)
-        target.comments_count = (target.comments_count or 0) + 1
         await db.commit()
         await db.refresh(comments)
     except IntegrityError:
         logger.info(f"comment creation failed by:{user_id}")
         await db.rollback()
         raise HTTPException(status_code=500, detail="internal server error")
+    await invalidate_feeds()
     logger.info(
         f"Comment successfully committed to database by {username} with ID: {comments.id if hasattr(comments, 'id') else 'unknown'}"
     )
@@ -79,45 +63,85 @@ async def view(page, limit, db, payload):
     if not user_id:
         logger.warning("Unauthorized access attempt — missing 'sub' in token payload.")
         raise HTTPException(status_code=403, detail="Unauthorized access.")
-    offset = (page - 1) * limit
-    stmt = select(Comment).options(selectinload(Comment.user))
-    total = (
-        await db.execute(select(func.count()).select_from(stmt.subquery()))
-    ).scalar() or 0
-    result = (await db.execute(stmt.offset(offset).limit(limit))).scalars().all()
-    items = []
-    for comment in result:
-        comment_data = Commenter.model_validate(comment)
-        comment_data.profile_picture = comment.user.profile_picture
-        comment_data.name = comment.user.name
-        comment_data.reactions = await react_summary(db, comment.id)
-        items.append(comment_data)
-    data = PaginatedMetadata[Commenter](
-        items=items,
-        pagination=PaginatedResponse(page=page, limit=limit, total=total),
-    )
+    result, pagination = await paginate(db, comment_query(), page, limit, scalars=False)
+    items = await merge_pending(Comment, [comment_of(row) for row in result])
+    data = PaginatedMetadata[Commenter](items=items, pagination=pagination)
     logger.info(f"Fetched {len(result)} comments for user={user_id} (page={page}).")
     return StandardResponse(status="success", message="comments", data=data)
 
 
-async def fetch_some(comment_id, db, payload):
+def comment_keys(sorting):
+    if sorting == "popular":
+        return (Comment.reacts_count, Comment.id)
+    return (Comment.time_of_post, Comment.id)
+
+
+def comment_values(comment, sorting):
+    if sorting == "popular":
+        return (comment.reacts_count or 0, comment.id)
+    return (comment.time_of_post, comment.id)
+
+
+def comment_query():
+    return select(Comment, User.name, User.profile_picture).join(
+        User, User.id == Comment.user_id
+    )
+
+
+def comment_of(row) -> Commenter:
+    data = Commenter.model_validate(row.Comment)
+    data.profile_picture = [row.profile_picture] if row.profile_picture else []
+    data.name = [row.name] if row.name else []
+    data.reactions = [summary_of(row.Comment)]
+    return data
+
+
+async def blog_comments(
+    blog_id, page, limit, db, payload, sorting="recent", cursor=None
+):
     user_id = payload.get("user_id")
-    logger.warning("Unauthorized access attempt — missing 'sub' in token payload.")
     if not user_id:
+        logger.warning("Unauthorized access attempt — missing 'sub' in token payload.")
         raise HTTPException(status_code=403, detail="Unauthorized access.")
+    keys = comment_keys(sorting)
     stmt = (
-        select(Comment)
-        .options(selectinload(Comment.user))
-        .where(Comment.id == comment_id)
+        comment_query()
+        .where(Comment.blog_id == blog_id)
+        .order_by(*(key.desc() for key in keys))
+    )
+    if cursor:
+        stmt = stmt.where(keyset_lt(keys, decode_cursor(cursor, f"comments-{sorting}")))
+    result, pagination = await paginate(
+        db,
+        stmt,
+        page,
+        limit,
+        strategy="has_more" if cursor else None,
+        scalars=False,
+        offset=0 if cursor else None,
     )
-    result = (await db.execute(stmt)).scalar_one_or_none()
+    if pagination.has_more:
+        pagination.next_cursor = encode_cursor(
+            f"comments-{sorting}", comment_values(result[-1].Comment, sorting)
+        )
+    items = await merge_pending(Comment, [comment_of(row) for row in result])
+    data = PaginatedMetadata[Commenter](items=items, pagination=pagination)
+    logger.info(f"Fetched {len(result)} comments on blog_id={blog_id} (page={page}).")
+    return StandardResponse(status="success", message="comments", data=data)
+
+
+async def fetch_some(comment_id, db, payload):
+    user_id = payload.get("user_id")
+    logger.warning("Unauthorized access attempt — missing 'sub' in token payload.")
+    if not user_id:
+        raise HTTPException(status_code=403, detail="Unauthorized access.")
+    stmt = comment_query().where(Comment.id == comment_id)
+    result = (await db.execute(stmt)).one_or_none()
     if not result:
         logger.info(f"No comment found for com_id={comment_id}")
         return StandardResponse(status="failure", message="invalid id")
-    data = Commenter.model_validate(result)
-    data.profile_picture = result.user.profile_picture
-    data.name = result.user.name
-    data.reactions = await react_summary(db, result.id)
+    data = comment_of(result)
+    await merge_pending(Comment, [data])
     logger.info(f"Successfully fetched comment com_id={comment_id} for user={user_id}")
     return StandardResponse(status="success", message="requested data", data=data)
 
@@ -128,27 +152,14 @@ async def trending(sorting, page, limit, db, payload):
     if not user_id:
         logger.warning("Unauthorized access attempt — missing 'sub' in token payload.")
         raise HTTPException(status_code=403, detail="Unauthorized access.")
-    offset = (page - 1) * limit
-    stmt = select(Comment).options(selectinload(Comment.user))
-    total = (
-        await db.execute(select(func.count()).select_from(stmt.subquery()))
-    ).scalar()
+    stmt = comment_query()
     if sorting == "recent":
         stmt = stmt.order_by(Comment.time_of_post.desc())
     if sorting == "popular":
         stmt = stmt.order_by(Comment.reacts_count.desc())
-    result = (await db.execute(stmt.offset(offset).limit(limit))).scalars().all()
-    items = []
-    for comment in result:
-        comment_data = Commenter.model_validate(comment)
-        comment_data.profile_picture = comment.user.profile_picture
-        comment_data.name = comment.user.name
-        comment_data.reactions = await react_summary(db, comment.id)
-        items.append(comment_data)
-    data = PaginatedMetadata[Commenter](
-        items=items,
-        pagination=PaginatedResponse(page=page, limit=limit, total=total),
-    )
+    result, pagination = await paginate(db, stmt, page, limit, scalars=False)
+    items = await merge_pending(Comment, [comment_of(row) for row in result])
+    data = PaginatedMetadata[Commenter](items=items, pagination=pagination)
     logger.info(f"Fetched {len(result)} comments for user={username} (page={page})")
     return StandardResponse(status="success", message="comments", data=data)
 
@@ -179,6 +190,7 @@ async def change(comment_id, content, db, payload):
         await db.rollback()
         logger.info(f"failed to edit comment for user_id:{user_id}")
         raise HTTPException(status_code=500, detail="internal server error")
+    await invalidate_feeds()
     logger.info(
         f"Successfully edited blog_id={data.id} by user={username} (ID={user_id})"
     )
@@ -208,10 +220,9 @@ async def delete_one(comment_id, db, payload):
             f"No comment found for comment_id={comment_id} and user_id={user_id}."
         )
         return {"status": "no data", "message": "invalid field"}
-    target = await db.get(Blog, data.blog_id)
     try:
         await db.delete(data)
-        target.comments_count = max((target.comments_count or 1) - 1, 0)
+        await increment(db, Blog, data.blog_id, {"comments_count": -1})
         await db.commit()
     except IntegrityError:
         await db.rollback()
@@ -219,6 +230,7 @@ async def delete_one(comment_id, db, payload):
             f"failed to delete comment, with comment id:{comment_id}, for user:{user_id}"
         )
         raise HTTPException(status_code=500, detail="internal server error")
+    await invalidate_feeds()
 
     logger.info(
         f"Comment deleted successfully — blog_id={data.id}, user={username} (ID={user_id})"
@@ -0,0 +1,134 @@
+from app.core.config import settings
+from app.core.redis_config import async_redis_client
+from app.log.logger import get_loggers
+from app.models_sql import Blog, Comment
+from sqlalchemy import update, func
+
+logger = get_loggers("counters")
+
+DIRTY_KEY = "counters:dirty"
+BUFFERED_MODELS = {model.__tablename__: model for model in (Blog, Comment)}
+
+
+def pending_key(model, target_id) -> str:
+    return f"counters:pending:{model.__tablename__}:{target_id}"
+
+
+def write_behind() -> bool:
+    return settings.COUNTER_WRITE_BEHIND
+
+
+async def push(model, target_id, deltas: dict[str, int]):
+    pipe = async_redis_client.pipeline()
+    for column, delta in deltas.items():
+        pipe.hincrby(pending_key(model, target_id), column, delta)
+    pipe.sadd(DIRTY_KEY, f"{model.__tablename__}:{target_id}")
+    await pipe.execute()
+
+
+async def buffer(model, target_id, deltas: dict[str, int]) -> bool:
+    if not write_behind() or not deltas:
+        return False
+    try:
+        await push(model, target_id, deltas)
+    except Exception as e:
+        logger.warning(f"Counter buffer unavailable, writing through: {e}")
+        return False
+    return True
+
+
+async def pending(model, ids) -> dict[int, dict[str, int]]:
+    ids = [target_id for target_id in ids if target_id is not None]
+    if not write_behind() or not ids:
+        return {}
+    try:
+        pipe = async_redis_client.pipeline()
+        for target_id in ids:
+            pipe.hgetall(pending_key(model, target_id))
+        values = await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Pending counters unavailable: {e}")
+        return {}
+    return {
+        target_id: {column.decode(): int(delta) for column, delta in value.items()}
+        for target_id, value in zip(ids, values)
+        if value
+    }
+
+
+async def merge_pending(model, items):
+    deltas = await pending(model, [item.id for item in items])
+    for item in items:
+        for column, delta in deltas.get(item.id, {}).items():
+            field = column.removesuffix("_count")
+            if column in type(item).model_fields and getattr(item, column) is not None:
+                setattr(item, column, max(getattr(item, column) + delta, 0))
+            for summary in getattr(item, "reactions", None) or []:
+                if field in type(summary).model_fields:
+                    setattr(summary, field, max(getattr(summary, field) + delta, 0))
+    return items
+
+
+async def increment(db, model, target_id, deltas: dict[str, int], *criteria):
+    if not deltas:
+        return None
+    stmt = (
+        update(model)
+        .where(model.id == target_id, *criteria)
+        .values(
+            {
+                column: func.greatest(
+                    func.coalesce(getattr(model, column), 0) + delta, 0
+                )
+                for column, delta in deltas.items()
+            }
+        )
+        .returning(model.id, *(getattr(model, column) for column in deltas))
+        .execution_options(synchronize_session=False)
+    )
+    return (await db.execute(stmt)).one_or_none()
+
+
+async def drain(limit: int) -> list[tuple[type, int, dict[str, int]]]:
+    members = await async_redis_client.spop(DIRTY_KEY, limit) or []
+    drained = []
+    for member in members:
+        table, _, target_id = member.decode().rpartition(":")
+        model = BUFFERED_MODELS.get(table)
+        if model is None:
+            continue
+        pipe = async_redis_client.pipeline(transaction=True)
+        pipe.hgetall(pending_key(model, target_id))
+        pipe.delete(pending_key(model, target_id))
+        value, _ = await pipe.execute()
+        deltas = {
+            column.decode(): int(delta) for column, delta in value.items() if int(delta)
+        }
+        if deltas:
+            drained.append((model, int(target_id), deltas))
+    return drained
+
+
+async def restore(db, drained):
+    unqueued = []
+    for model, target_id, deltas in drained:
+        try:
+            await push(model, target_id, deltas)
+        except Exception as e:
+            logger.warning(
+                f"Could not requeue counters for {model.__tablename__} {target_id}: {e}"
+            )
+            unqueued.append((model, target_id, deltas))
+    if not unqueued:
+        return
+    try:
+        for model, target_id, deltas in unqueued:
+            await increment(db, model, target_id, deltas)
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        lost = [
+            (model.__tablename__, target_id, deltas)
+            for model, target_id, deltas in unqueued
+        ]
+        logger.error(f"Buffered counter deltas lost: {lost} ({e})")
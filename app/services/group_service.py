@@ -1,9 +1,7 @@
 from fastapi import HTTPException
-import os, shutil, uuid
 from app.models_sql import Group, GroupAdmin, Member, User
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
-from werkzeug.utils import secure_filename
 from sqlalchemy.orm import selectinload
 from sqlalchemy import or_, and_
 from app.api.v1.models import (
@@ -14,6 +12,11 @@ from app.api.v1.models import (
     GroupResponse,
 )
 from app.log.logger import get_loggers
+from app.services.upload_service import (
+    save_upload,
+    acquire_images,
+    release_images,
+)
 
 
 logger = get_loggers("group")
@@ -49,17 +52,14 @@ async def grouping(
         logger.warning(f"not a valid user, user_id, {user_id}")
         raise HTTPException(status_code=403, detail="not a valid user")
     if profile_picture is not None:
-        filename = f"{uuid.uuid4()}_{secure_filename(profile_picture.filename)}"
-        file_path = os.path.join("images", filename)
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(profile_picture.file, buffer)
-        file_url = f"/images/{filename}"
+        file_url = await save_upload(profile_picture)
         pic = file_url
     else:
         pic = None
     grp = Group(profile_picture=pic, name=name)
     try:
         db.add(grp)
+        await acquire_images(db, [pic])
         await db.flush()
         logger.info(f"group created with id: {grp.id} by user_id: {user_id}")
         admin = GroupAdmin(user_id=user_id, group_id=grp.id, username=username)
@@ -103,11 +103,9 @@ async def edit_group(
     if name is not None:
         group.name = name
     if profile_picture is not None:
-        filename = f"{uuid.uuid4()}_{secure_filename(profile_picture.filename)}"
-        file_path = os.path.join("images", filename)
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(profile_picture.file, buffer)
-        file_url = f"/images/{filename}"
+        file_url = await save_upload(profile_picture)
+        await release_images(db, [group.profile_picture])
+        await acquire_images(db, [file_url])
         group.profile_picture = file_url
     try:
         await db.commit()
@@ -8,15 +8,18 @@ from app.models_sql import (
     GroupTask,
     Contribute,
     Participant,
+    Opinion,
+    group_task_participants,
 )
 from app.api.v1.models import (
     TaskResponseG,
     StandardResponse,
     PaginatedMetadata,
-    PaginatedResponse,
     ContributeResponseG,
 )
 from app.log.logger import get_loggers
+from app.utils.pagination import paginate
+from app.utils.etag import change_markers, minute_bucket
 from datetime import timezone, datetime, date
 
 logger = get_loggers("g_tasks")
@@ -177,6 +180,53 @@ async def piggy(
     )
 
 
+async def tasks_version(db, group_id, payload, page=None, limit=None):
+    group_tasks = select(GroupTask.id).where(GroupTask.group_id == group_id)
+    stmt = select(
+        change_markers(GroupTask, GroupTask.group_id == group_id),
+        change_markers(Opinion, Opinion.group_id == group_id),
+        change_markers(Participant, Participant.group_id == group_id),
+        change_markers(
+            group_task_participants,
+            group_task_participants.c.group_task_id.in_(group_tasks),
+            extra=[func.sum(group_task_participants.c.participant_id)],
+        ),
+        change_markers(GroupAdmin, GroupAdmin.group_id == group_id),
+    )
+    digests = (await db.execute(stmt)).first()
+    return (
+        payload.get("user_id"),
+        payload.get("sub"),
+        group_id,
+        page,
+        limit,
+        minute_bucket(),
+        *digests,
+    )
+
+
+async def task_version(db, group_id, task_id, payload):
+    linked = select(group_task_participants.c.participant_id).where(
+        group_task_participants.c.group_task_id == task_id
+    )
+    stmt = select(
+        change_markers(
+            GroupTask, GroupTask.group_id == group_id, GroupTask.id == task_id
+        ),
+        change_markers(Opinion, Opinion.task_id == task_id),
+        change_markers(Participant, Participant.id.in_(linked)),
+        change_markers(
+            group_task_participants,
+            group_task_participants.c.group_task_id == task_id,
+            extra=[func.sum(group_task_participants.c.participant_id)],
+        ),
+        change_markers(Participant, Participant.group_id == group_id),
+        change_markers(GroupAdmin, GroupAdmin.group_id == group_id),
+    )
+    digests = (await db.execute(stmt)).first()
+    return (payload.get("user_id"), payload.get("sub"), minute_bucket(), *digests)
+
+
 async def view_all_tasks(
     group_id,
     db,
@@ -189,7 +239,6 @@ async def view_all_tasks(
     if not user_id:
         logger.warning(f"not a valid user, user_id: {user_id}")
         raise HTTPException(status_code=403, detail="Unauthorized access.")
-    offset = (page - 1) * limit
     logger.info(
         f"Fetching tasks for user_id={user_id}, username={username}, page={page}, limit={limit}"
     )
@@ -227,22 +276,19 @@ async def view_all_tasks(
             )
         )
     ).distinct()
-    total = (
-        await db.execute(select(func.count()).select_from(stmt.subquery()))
-    ).scalar()
+    tasks, pagination = await paginate(db, stmt, page, limit)
     logger.info(
-        f"user_id: {user_id} accessed total tasks for group_id: {group_id}, total tasks: {total}"
+        f"user_id: {user_id} accessed total tasks for group_id: {group_id}, total tasks: {pagination.total}"
     )
-    tasks = (await db.execute(stmt.offset(offset).limit(limit))).scalars().all()
     if not tasks:
         logger.warning(f"all tasks queried, but none found for {username}")
         raise HTTPException(status_code=404, detail="No target found")
     data = PaginatedMetadata[TaskResponseG](
         items=[TaskResponseG.model_validate(task) for task in tasks],
-        pagination=PaginatedResponse(page=page, limit=limit, total=total),
+        pagination=pagination,
     )
     logger.info(
-        f"all tasks fetched successfully by {username}, page={page}, limit={limit}, total={total}"
+        f"all tasks fetched successfully by {username}, page={page}, limit={limit}, total={pagination.total}"
     )
     return StandardResponse(status="success", message="tasks data", data=data)
 
@@ -374,7 +420,6 @@ async def get_contribution(
         raise HTTPException(
             status_code=401, detail="Username mismatch. Unauthorized task creation."
         )
-    offset = (page - 1) * limit
     stmt = (
         select(Participant)
         .join(Participant.group_tasks)
@@ -429,13 +474,10 @@ async def get_contribution(
         Contribute.user_id == user_id,
         Contribute.grouptask_id == grouptask_id,
     )
-    total = (
-        await db.execute(select(func.count()).select_from(stmt.subquery()))
-    ).scalar()
+    result, pagination = await paginate(db, stmt, page, limit)
     logger.info(
-        f"Total contributions retrieved for grouptask_id: {grouptask_id} by user_id: {user_id} total: {total}"
+        f"Total contributions retrieved for grouptask_id: {grouptask_id} by user_id: {user_id} total: {pagination.total}"
     )
-    result = (await db.execute(stmt.offset(offset).limit(limit))).scalars().all()
     items = []
     for con in result:
         collection = ContributeResponseG.model_validate(con)
@@ -444,7 +486,7 @@ async def get_contribution(
         items.append(collection)
     data = PaginatedMetadata[ContributeResponseG](
         items=items,
-        pagination=PaginatedResponse(page=page, limit=limit, total=total),
+        pagination=pagination,
     )
     logger.info("Paginated data prepared successfully for '%s'", user_id)
     return StandardResponse(status="success", message="contributions", data=data)
@@ -532,7 +574,6 @@ async def completed_target(
     if not user_id:
         logger.warning(f"not a valid user, user_id: {user_id}")
         raise HTTPException(status_code=403, detail="Unauthorized access.")
-    offset = (page - 1) * limit
     stmt = (
         select(Participant)
         .join(GroupAdmin, GroupAdmin.group_id == Participant.group_id)
@@ -561,22 +602,17 @@ async def completed_target(
             GroupTask.complete.is_(True),
         )
     )
-    total = (
-        await db.execute(select(func.count()).select_from(stmt.subquery()))
-    ).scalar() or 0
-    logger.info(f"{username} retrieved total count of completed tasks total: {total}")
-    data = (await db.execute(stmt.offset(offset).limit(limit))).scalars().all()
+    data, pagination = await paginate(db, stmt, page, limit)
+    logger.info(
+        f"{username} retrieved total count of completed tasks total: {pagination.total}"
+    )
     if not data:
         logger.warning(f"{username} queried completed tasks but found none")
         raise HTTPException(status_code=404, detail="you have no completed target")
     logger.info(f"{username} successfully queried completed tasks")
     check = PaginatedMetadata[TaskResponseG](
         items=[TaskResponseG.model_validate(task) for task in data],
-        pagination=PaginatedResponse(
-            page=page,
-            limit=limit,
-            total=total,
-        ),
+        pagination=pagination,
     )
     logger.info(f"{username} successfully queried completed tasks")
     return StandardResponse(
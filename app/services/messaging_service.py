@@ -1,20 +1,79 @@
 from app.api.v1.models import (
     Chat,
     StandardResponse,
-    PaginatedResponse,
 )
-from app.models_sql import Messaging, User
+from app.models_sql import Messaging, User, Conversation
 from fastapi import HTTPException
 from datetime import timezone, datetime
 from app.log.logger import get_loggers
+from app.utils.pagination import paginate, keyset_lt, keyset_gt
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import select, or_, func, and_
-import os, shutil, uuid
-from werkzeug.utils import secure_filename
+from sqlalchemy import select, or_, and_, update, func, true, union_all
+from sqlalchemy.orm import aliased
+from sqlalchemy.dialects.postgresql import insert
+from app.core.config import settings
+from app.services.receipt_service import acknowledge
+from app.services.upload_service import (
+    save_upload,
+    acquire_images,
+    release_images,
+)
 
 logger = get_loggers("chat")
 
 
+def conversation_pair(first: str, second: str) -> tuple[str, str]:
+    return (first, second) if first <= second else (second, first)
+
+
+def conversation_side(username: str, pair: tuple[str, str]) -> str:
+    return "a" if username == pair[0] else "b"
+
+
+def conversation_of(pair: tuple[str, str]):
+    return and_(Conversation.user_a == pair[0], Conversation.user_b == pair[1])
+
+
+async def record_message(db, message):
+    pair = conversation_pair(message.username, message.receiver)
+    latest = {
+        "last_message_id": message.id,
+        "last_message_at": message.time_of_chat,
+        "deleted_a": False,
+        "deleted_b": False,
+    }
+    stmt = insert(Conversation).values(user_a=pair[0], user_b=pair[1], **latest)
+    if pair[0] != pair[1]:
+        unread = f"unread_{conversation_side(message.receiver, pair)}"
+        stmt = stmt.values({unread: 1})
+        latest[unread] = getattr(Conversation, unread) + 1
+    stmt = stmt.on_conflict_do_update(
+        constraint="unique_conversation_pair", set_=latest
+    ).returning(Conversation.id)
+    message.conversation_id = (await db.execute(stmt)).scalar_one()
+    return message.conversation_id
+
+
+def visible_to(username: str):
+    return or_(
+        and_(Messaging.username == username, Messaging.sender_deleted.is_not(True)),
+        and_(Messaging.receiver == username, Messaging.receiver_deleted.is_not(True)),
+    )
+
+
+def inbox_side(user, deleted, username, window, *criteria):
+    return (
+        select(Conversation)
+        .where(user == username, deleted == False, *criteria)
+        .order_by(Conversation.last_message_at.desc(), Conversation.id.desc())
+        .limit(window)
+    )
+
+
+def conversation_id_of(pair: tuple[str, str]):
+    return select(Conversation.id).where(conversation_of(pair)).scalar_subquery()
+
+
 async def text_him(
     message,
     receiver,
@@ -37,11 +96,7 @@ async def text_him(
         logger.info(f"Message send failed: receiver '{receiver}' not found.")
         raise HTTPException(status_code=404, detail="user not found")
     if pics is not None:
-        filename = f"{uuid.uuid4()}_{secure_filename(pics.filename)}"
-        file_path = os.path.join("images", filename)
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(pics.file, buffer)
-        file_url = f"/images/{filename}"
+        file_url = await save_upload(pics)
         pics = file_url
     else:
         pics = None
@@ -60,6 +115,9 @@ async def text_him(
     )
     try:
         db.add(new_message)
+        await db.flush()
+        await record_message(db, new_message)
+        await acquire_images(db, [pics])
         await db.commit()
         await db.refresh(new_message)
     except IntegrityError:
@@ -82,40 +140,59 @@ async def view_messages(
     if not username:
         logger.warning(f"Unauthorized access attempt by user: {username}")
         raise HTTPException(status_code=403, detail="not a valid user")
-    offset = (page - 1) * limit
-    conversation_key = func.concat(
-        func.least(Messaging.username, Messaging.receiver),
-        ":",
-        func.greatest(Messaging.username, Messaging.receiver),
+    window = page * limit + 1
+    sides = union_all(
+        inbox_side(Conversation.user_a, Conversation.deleted_a, username, window),
+        inbox_side(
+            Conversation.user_b,
+            Conversation.deleted_b,
+            username,
+            window,
+            Conversation.user_a != username,
+        ),
     )
-    stmt = (
-        select(Messaging, conversation_key.label("conversation_id"))
-        .where(
-            or_(
-                and_(Messaging.username == username, Messaging.sender_deleted == False),
-                and_(
-                    Messaging.receiver == username, Messaging.receiver_deleted == False
-                ),
-            )
-        )
-        .distinct(conversation_key)
-        .order_by(conversation_key, Messaging.time_of_chat.desc())
+    inbox = aliased(Conversation, sides.subquery("inbox"))
+    stmt = select(inbox).order_by(inbox.last_message_at.desc(), inbox.id.desc())
+    view, pagination = await paginate(db, stmt, page, limit, strategy="has_more")
+    logger.info(
+        f"Conversations found for user '{username}' on page {page}: {len(view)}"
     )
-    total = (
-        await db.execute(select(func.count()).select_from(stmt.subquery()))
-    ).scalar() or 0
-    logger.info(f"Total conversations found for user '{username}': {total}")
-    view = (await db.execute(stmt.offset(offset).limit(limit))).all()
-    for msg, _ in view:
-        if msg.receiver == username:
-            msg.delivered = True
-    await db.commit()
+    previews = {}
+    if view:
+        latest = (
+            select(Messaging)
+            .where(Messaging.conversation_id == Conversation.id, visible_to(username))
+            .order_by(Messaging.time_of_chat.desc(), Messaging.id.desc())
+            .limit(1)
+            .lateral("latest")
+        )
+        rows = await db.execute(
+            select(Conversation.id, aliased(Messaging, latest))
+            .join(latest, true())
+            .where(Conversation.id.in_([conversation.id for conversation in view]))
+        )
+        previews = dict(rows.all())
+    received = [msg.id for msg in previews.values() if msg.receiver == username]
+    if received:
+        await acknowledge(db, username, max(received), "delivered", list(previews))
+        await db.commit()
     conversations = {}
-    for msg, conv_id in view:
-        conversations.setdefault(conv_id, []).append(Chat.model_validate(msg))
+    unread = {}
+    for conversation in view:
+        msg = previews.get(conversation.id)
+        conv_id = f"{conversation.user_a}:{conversation.user_b}"
+        side = conversation_side(username, (conversation.user_a, conversation.user_b))
+        unread[conv_id] = getattr(conversation, f"unread_{side}")
+        conversations[conv_id] = []
+        if msg is not None:
+            chat = Chat.model_validate(msg)
+            chat.conversation_id = conv_id
+            chat.delivered = chat.delivered or msg.id in received
+            conversations[conv_id].append(chat)
     data = {
         "conversations": conversations,
-        "pagination": PaginatedResponse(page=page, limit=limit, total=total),
+        "unread": unread,
+        "pagination": pagination,
     }
     logger.info(f"Fetched conversations for user '{username}' (page={page}).")
     return StandardResponse(status="success", message="your messages", data=data)
@@ -127,57 +204,104 @@ async def view_message(
     limit,
     db,
     payload,
+    before=None,
+    after=None,
 ):
     username = payload.get("sub")
     if not username:
         logger.warning(f"Unauthorized access attempt by user: {username}")
         raise HTTPException(status_code=403, detail="not a valid user")
-    offset = (page - 1) * limit
-    conversation_key = func.concat(
-        func.least(Messaging.username, Messaging.receiver),
-        ":",
-        func.greatest(Messaging.username, Messaging.receiver),
+    if before is not None and after is not None:
+        raise HTTPException(status_code=400, detail="use either before or after")
+    pair = conversation_pair(username, receiver)
+    conv_id = f"{pair[0]}:{pair[1]}"
+    keys = (Messaging.time_of_chat, Messaging.id)
+    stmt = select(Messaging).where(
+        Messaging.conversation_id == conversation_id_of(pair), visible_to(username)
     )
-    stmt = (
-        select(Messaging, conversation_key.label("conversation_id"))
-        .where(
-            or_(
-                and_(
-                    Messaging.username == username,
-                    Messaging.receiver == receiver,
-                    Messaging.sender_deleted == False,
-                ),
-                and_(
-                    Messaging.username == receiver,
-                    Messaging.receiver == username,
-                    Messaging.receiver_deleted == False,
-                ),
+    anchor_id = before if before is not None else after
+    if anchor_id is not None:
+        anchor = (
+            await db.execute(
+                select(*keys).where(
+                    Messaging.id == anchor_id,
+                    Messaging.conversation_id == conversation_id_of(pair),
+                )
             )
-        )
-        .order_by(Messaging.time_of_chat.desc())
+        ).one_or_none()
+        if not anchor:
+            raise HTTPException(status_code=400, detail="invalid cursor")
+    if after is not None:
+        stmt = stmt.where(keyset_gt(keys, list(anchor)))
+        stmt = stmt.order_by(*(key.asc() for key in keys))
+    else:
+        if before is not None:
+            stmt = stmt.where(keyset_lt(keys, list(anchor)))
+        stmt = stmt.order_by(*(key.desc() for key in keys))
+    view, pagination = await paginate(
+        db,
+        stmt,
+        page,
+        limit,
+        strategy="has_more" if anchor_id is not None else None,
+        offset=0 if anchor_id is not None else None,
     )
-    total = (
-        await db.execute(select(func.count()).select_from(stmt.subquery()))
-    ).scalar() or 0
-    logger.info(f"Total messages found between '{username}' and '{receiver}': {total}")
-    view = (await db.execute(stmt.offset(offset).limit(limit))).all()
-    for msg, _ in view:
+    if after is not None:
+        view = view[::-1]
+    logger.info(
+        f"Total messages found between '{username}' and '{receiver}': {pagination.total}"
+    )
+    received = [msg.id for msg in view if msg.receiver == username]
+    if received:
+        await acknowledge(db, username, max(received), "seen", conversation_id_of(pair))
+        await db.commit()
+    conversations = {conv_id: []}
+    for msg in view:
+        chat = Chat.model_validate(msg)
+        chat.conversation_id = conv_id
         if msg.receiver == username:
-            msg.seen = True
-    await db.commit()
-    conversations = {}
-    for msg, conv_id in view:
-        conversations.setdefault(conv_id, []).append(Chat.model_validate(msg))
+            chat.delivered = chat.seen = True
+        conversations[conv_id].append(chat)
     data = {
         "conversations": conversations,
-        "pagination": PaginatedResponse(page=page, limit=limit, total=total),
+        "cursors": {
+            "before": view[-1].id if view else before,
+            "after": view[0].id if view else after,
+        },
+        "pagination": pagination,
     }
     logger.info(
-        f"Fetched messages between '{username}' and '{receiver}' (page={page})."
+        f"Fetched messages between '{username}' and '{receiver}' (page={page}, before={before}, after={after})."
     )
     return StandardResponse(status="success", message="your messages", data=data)
 
 
+async def acknowledge_messages(
+    receiver,
+    upto_id,
+    status,
+    db,
+    payload,
+):
+    username = payload.get("sub")
+    if not username:
+        logger.warning(f"Unauthorized access attempt by user: {username}")
+        raise HTTPException(status_code=403, detail="not a valid user")
+    pair = conversation_pair(username, receiver)
+    try:
+        marked = await acknowledge(
+            db, username, upto_id, status, conversation_id_of(pair)
+        )
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        logger.error(
+            f"Failed to acknowledge messages from '{receiver}' by '{username}'."
+        )
+        raise HTTPException(status_code=500, detail="internal server error")
+    return {"success": f"{marked} messages marked {status}", "upto_id": upto_id}
+
+
 async def delete_message(
     message_id,
     db,
@@ -200,11 +324,30 @@ async def delete_message(
         raise HTTPException(
             status_code=403, detail="not authorized to delete this message"
         )
+    already_gone = message.sender_deleted and message.receiver_deleted
+    unseen = (
+        message.receiver == username
+        and message.username != username
+        and not message.receiver_deleted
+        and not message.seen
+    )
     if message.username == username:
         message.sender_deleted = True
     elif message.receiver == username:
         message.receiver_deleted = True
     try:
+        if not already_gone and message.sender_deleted and message.receiver_deleted:
+            await release_images(db, [message.pics])
+        if unseen and message.conversation_id is not None:
+            pair = conversation_pair(message.username, message.receiver)
+            unread = getattr(
+                Conversation, f"unread_{conversation_side(username, pair)}"
+            )
+            await db.execute(
+                update(Conversation)
+                .where(Conversation.id == message.conversation_id)
+                .values({unread: func.greatest(unread - 1, 0)})
+            )
         await db.commit()
     except IntegrityError:
         logger.error(
@@ -226,32 +369,74 @@ async def clear_conversation(
     if not user_id:
         logger.warning(f"Unauthorized access attempt by user: {user_id}")
         raise HTTPException(status_code=403, detail="not a valid user")
-    stmt = select(Messaging).where(
-        or_(
-            ((Messaging.username == username) & (Messaging.receiver == chat_partner)),
-            ((Messaging.username == chat_partner) & (Messaging.receiver == username)),
-        )
-    )
-    messages = (await db.execute(stmt)).scalars().all()
-    if not messages:
+    pair = conversation_pair(username, chat_partner)
+    side = conversation_side(username, pair)
+    conversation_id = (
+        await db.execute(select(Conversation.id).where(conversation_of(pair)))
+    ).scalar_one_or_none()
+    if conversation_id is None:
         logger.info(
             f"No messages found between '{username}' and '{chat_partner}' to delete."
         )
         raise HTTPException(status_code=404, detail="no messages found to delete")
-    for message in messages:
-        if message.username == username:
-            message.sender_deleted = True
-        elif message.receiver == username:
-            message.receiver_deleted = True
+    sides = [(Messaging.sender_deleted, Messaging.username == username)]
+    if chat_partner != username:
+        sides.append((Messaging.receiver_deleted, Messaging.receiver == username))
+    cleared = 0
     try:
-        await db.commit()
+        for flag, mine in sides:
+            pending = (
+                select(Messaging.id)
+                .where(
+                    Messaging.conversation_id == conversation_id,
+                    mine,
+                    flag.is_not(True),
+                )
+                .limit(settings.BULK_DELETE_BATCH_SIZE)
+            )
+            while True:
+                rows = (
+                    await db.execute(
+                        update(Messaging)
+                        .where(Messaging.id.in_(pending.scalar_subquery()))
+                        .values({flag.key: True})
+                        .returning(
+                            Messaging.pics,
+                            Messaging.sender_deleted,
+                            Messaging.receiver_deleted,
+                        )
+                        .execution_options(synchronize_session=False)
+                    )
+                ).all()
+                if not rows:
+                    break
+                await release_images(
+                    db,
+                    [
+                        row.pics
+                        for row in rows
+                        if row.sender_deleted and row.receiver_deleted
+                    ],
+                )
+                await db.commit()
+                cleared += len(rows)
     except IntegrityError:
         await db.rollback()
         logger.error(
             f"Failed to clear conversation between '{username}' and '{chat_partner}'."
         )
         raise HTTPException(status_code=500, detail="internal server error")
+    try:
+        await db.execute(
+            update(Conversation)
+            .where(Conversation.id == conversation_id)
+            .values({f"deleted_{side}": True, f"unread_{side}": 0})
+        )
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail="internal server error")
     logger.info(
-        f"All messages between '{username}' and '{chat_partner}' deleted by user '{username}'."
+        f"All messages between '{username}' and '{chat_partner}' deleted by user '{username}', {cleared} updated."
     )
     return {"success": f"all messages with {chat_partner} successfully deleted"}
@@ -3,7 +3,6 @@ from app.api.v1.models import (
     OpinionResponse,
     StandardResponse,
     PaginatedMetadata,
-    PaginatedResponse,
     Voting,
 )
 from app.models_sql import (
@@ -16,6 +15,8 @@ from app.models_sql import (
     OpinionEnum,
 )
 from app.log.logger import get_loggers
+from app.utils.pagination import paginate
+from app.services.counter_service import increment
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
@@ -98,10 +99,9 @@ async def create_opinion(
         group_id=op.group_id,
         task_id=op.task_id,
     )
-    target = await db.get(GroupTask, op.task_id)
     try:
         db.add(new_opinion)
-        target.opinion_count = (target.opinion_count or 0) + 1
+        await increment(db, GroupTask, op.task_id, {"opinion_count": 1})
         await db.commit()
         await db.refresh(new_opinion)
     except IntegrityError:
@@ -129,7 +129,6 @@ async def fetch(
     if not user_id:
         logger.warning(f"not a valid user, user_id: {user_id}")
         raise HTTPException(status_code=403, detail="Unauthorized access.")
-    offset = (page - 1) * limit
     stmt = (
         select(Participant)
         .join(GroupAdmin, GroupAdmin.group_id == Participant.group_id)
@@ -154,13 +153,10 @@ async def fetch(
         )
         .order_by(Opinion.vote_count.desc())
     )
-    total = (
-        await db.execute(select(func.count()).select_from(stmt.subquery()))
-    ).scalar() or 0
+    result, pagination = await paginate(db, stmt, page, limit)
     logger.info(
-        f"{username} is fetching opinions for task_id: {task_id} in group_id: {group_id}, total: {total}"
+        f"{username} is fetching opinions for task_id: {task_id} in group_id: {group_id}, total: {pagination.total}"
     )
-    result = (await db.execute(stmt.offset(offset).limit(limit))).scalars().all()
     if not result:
         logger.warning(f"{username} unsuccessfully queried opinion")
         raise HTTPException(status_code=404, detail="No target found")
@@ -173,7 +169,7 @@ async def fetch(
         items.append(opinion)
     data = PaginatedMetadata[OpinionResponse](
         items=items,
-        pagination=PaginatedResponse(page=page, limit=limit, total=total),
+        pagination=pagination,
     )
     logger.info(f"{username}, fetched opinion his opinions")
     return StandardResponse(status="success", message="requested data", data=data)
@@ -247,9 +243,7 @@ async def votes(
         logger.info(f"user_id: {user_id} is updating vote on opinion_id: {opinion_id}")
         if result.vote == vote_enum:
             await db.delete(result)
-            await db.commit()
-            target.vote_count = max((target.vote_count or 0) - 1, 0)
-            db.add(target)
+            await increment(db, Opinion, opinion_id, {"vote_count": -1})
             await db.commit()
             logger.info(f"user_id: {user_id} removed vote on opinion_id: {opinion_id}")
             return StandardResponse(status="success", message="vote removed", data=vote)
@@ -278,9 +272,7 @@ async def votes(
         )
         try:
             db.add(place)
-            await db.commit()
-            target.vote_count = (target.vote_count or 0) + 1
-            db.add(target)
+            await increment(db, Opinion, opinion_id, {"vote_count": 1})
             await db.commit()
             await db.refresh(place)
         except IntegrityError:
@@ -339,10 +331,9 @@ async def delete_one(
             f"{username}, tried deleting a nonexistent opinion, opinion id: {opinion_id}"
         )
         raise HTTPException(status_code=404, detail="invalid field")
-    target = await db.get(GroupTask, task_id)
     try:
         await db.delete(data)
-        target.opinion_count = max((target.opinion_count or 0) - 1, 0)
+        await increment(db, GroupTask, task_id, {"opinion_count": -1})
         await db.commit()
     except IntegrityError:
         await db.rollback()
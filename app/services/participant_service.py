@@ -1,15 +1,14 @@
 from app.models_sql import Participant, GroupAdmin, GroupTask, Member
-from sqlalchemy import func, select, or_, and_
+from sqlalchemy import select, or_, and_
 from fastapi import HTTPException
 from app.api.v1.models import (
-    Participants,
-    PaginatedResponse,
     StandardResponse,
     PaginatedMetadata,
     ParticipantResponse,
 )
 from sqlalchemy.exc import IntegrityError
 from app.log.logger import get_loggers
+from app.utils.pagination import paginate
 
 logger = get_loggers("participants")
 
@@ -94,7 +93,6 @@ async def get_all(
     if not user_id:
         logger.warning(f"not a valid user, user_id: {user_id}")
         raise HTTPException(status_code=401, detail="not authorized")
-    offset = (page - 1) * limit
     stmt = (
         select(Participant)
         .join(Participant.group_tasks)
@@ -125,18 +123,15 @@ async def get_all(
         .join(Participant.group_tasks)
         .where(GroupTask.group_id == group_id, GroupTask.id == grouptask_id)
     )
-    total = (
-        await db.execute(select(func.count()).select_from(stmt.subquery()))
-    ).scalar() or 0
+    participant, pagination = await paginate(db, stmt, page, limit)
     logger.info(
-        f"user_id: {user_id} retrieved participants for group_id: {group_id} and grouptask_id: {grouptask_id}, total: {total}"
+        f"user_id: {user_id} retrieved participants for group_id: {group_id} and grouptask_id: {grouptask_id}, total: {pagination.total}"
     )
-    participant = (await db.execute(stmt.offset(offset).limit(limit))).scalars().all()
     if not participant:
         raise HTTPException(status_code=404, detail="no participants found")
     data = PaginatedMetadata[ParticipantResponse](
         items=[ParticipantResponse.model_validate(item) for item in participant],
-        pagination=PaginatedResponse(page=page, limit=limit, total=total),
+        pagination=pagination,
     )
     logger.info(
         f"participants data prepared for group_id: {group_id} and grouptask_id: {grouptask_id}"
@@ -221,7 +216,6 @@ async def completed_assignments(
     if not user_id:
         logger.warning(f"not a valid user, user_id: {user_id}")
         raise HTTPException(status_code=403, detail="Unauthorized access.")
-    offset = (page - 1) * limit
     stmt = (
         select(Participant)
         .join(Participant.group_tasks)
@@ -256,13 +250,10 @@ async def completed_assignments(
             Participant.assignment_complete.is_(True),
         )
     )
-    total = (
-        await db.execute(select(func.count()).select_from(stmt.subquery()))
-    ).scalar() or 0
+    data, pagination = await paginate(db, stmt, page, limit)
     logger.info(
-        f"{username} successfully queried completed assignments, total: {total}"
+        f"{username} successfully queried completed assignments, total: {pagination.total}"
     )
-    data = (await db.execute(stmt.offset(offset).limit(limit))).scalars().all()
     if not data:
         logger.warning(
             f"{username} has no completed assignments in group_id: {group_id} for grouptask_id: {group_task_id}"
@@ -272,11 +263,7 @@ async def completed_assignments(
         )
     check = PaginatedMetadata[ParticipantResponse](
         items=[ParticipantResponse.model_validate(part) for part in data],
-        pagination=PaginatedResponse(
-            page=page,
-            limit=limit,
-            total=total,
-        ),
+        pagination=pagination,
     )
     logger.info(f"{username} successfully queried completed assignments")
     return StandardResponse(
@@ -363,7 +350,6 @@ async def paid_levy(
     if not user_id:
         logger.warning(f"not a valid user, user_id: {user_id}")
         raise HTTPException(status_code=403, detail="Unauthorized access.")
-    offset = (page - 1) * limit
     stmt = (
         select(Participant)
         .join(Participant.group_tasks)
@@ -398,11 +384,10 @@ async def paid_levy(
             Participant.paid.is_(True),
         )
     )
-    total = (
-        await db.execute(select(func.count()).select_from(stmt.subquery()))
-    ).scalar() or 0
-    logger.info(f"{username} successfully queried paid levies, total: {total}")
-    data = (await db.execute(stmt.offset(offset).limit(limit))).scalars().all()
+    data, pagination = await paginate(db, stmt, page, limit)
+    logger.info(
+        f"{username} successfully queried paid levies, total: {pagination.total}"
+    )
     if not data:
         logger.warning(
             f"{username} has no paid levies in group_id: {group_id} for grouptask_id: {group_task_id}"
@@ -413,11 +398,7 @@ async def paid_levy(
     logger.info(f"{username} successfully queried paid levies")
     check = PaginatedMetadata[ParticipantResponse](
         items=[ParticipantResponse.model_validate(part) for part in data],
-        pagination=PaginatedResponse(
-            page=page,
-            limit=limit,
-            total=total,
-        ),
+        pagination=pagination,
     )
     logger.info(f"{username} successfully queried paid levies")
     return StandardResponse(
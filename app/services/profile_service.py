@@ -5,8 +5,10 @@ from app.models_sql import (
     Task,
     Share,
 )
+from app.utils.etag import change_markers, minute_bucket
+from app.utils.feed_cache import feed_generation, invalidate_feeds
 from app.api.v1.models import (
-    Blogger,
+    BlogListing,
     UserResponse,
     Commenter,
     TaskResponse,
@@ -15,7 +17,6 @@ from app.api.v1.models import (
     PaginatedMetadata,
     PaginatedResponse,
 )
-import uuid, os, shutil
 from fastapi import (
     HTTPException,
     status,
@@ -23,12 +24,19 @@ from fastapi import (
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import and_, select, func, or_
 from app.log.logger import get_loggers
-import redis
+from app.core.redis_config import redis_client
 import json, os
-from werkzeug.utils import secure_filename
 from sqlalchemy.orm import selectinload
 from sqlalchemy.exc import IntegrityError
 from app.core.config import settings
+from app.utils.search import trigram_match, trigram_rank
+from app.services.blog_service import listing_query, listing_of
+from app.services.counter_service import merge_pending
+from app.services.upload_service import (
+    save_upload,
+    acquire_images,
+    release_images,
+)
 import tracemalloc
 
 tracemalloc.start()
@@ -36,15 +44,6 @@ tracemalloc.start()
 
 logger = get_loggers("profile")
 
-redis_url = settings.REDIS_URL
-if redis_url.startswith("rediss://"):
-    redis_client = redis.from_url(
-        redis_url,
-        ssl_cert_reqs=None,
-        decode_responses=True,
-    )
-else:
-    redis_client = redis.from_url(redis_url, decode_responses=True)
 try:
     print(redis_client.ping())
 except Exception as e:
@@ -77,6 +76,19 @@ async def helper_f(
     )
 
 
+async def profile_version(db, user_id, page, limit):
+    generation = await feed_generation()
+    if generation is None or not user_id:
+        return None
+    stmt = select(
+        change_markers(User, User.id == user_id),
+        change_markers(Task, Task.user_id == user_id),
+        change_markers(Share, Share.user_id == user_id),
+    )
+    digests = (await db.execute(stmt)).first()
+    return (user_id, page, limit, generation, minute_bucket(), *digests)
+
+
 async def view(
     page,
     limit,
@@ -102,21 +114,16 @@ async def view(
     tasks = await helper_f(db, Task, TaskResponse, user_id, page, limit)
     offset = (page - 1) * limit
     stmt = (
-        select(Blog)
-        .options(selectinload(Blog.user), selectinload(Blog.comments))
+        listing_query()
         .where(Blog.user_id == user_id)
+        .order_by(Blog.time_of_post.desc(), Blog.id.desc())
     )
-    result = (await db.execute(stmt.offset(offset).limit(limit))).scalars().all()
+    result = (await db.execute(stmt.offset(offset).limit(limit))).all()
     total = (
         await db.execute(select(func.count()).select_from(stmt.subquery()))
     ).scalar() or 0
-    items = []
-    for blog in result:
-        blog_data = Blogger.model_validate(blog)
-        blog_data.profile_picture = blog.user.profile_picture
-        blog_data.name = blog.user.name
-        items.append(blog_data)
-    blogs = PaginatedMetadata[Blogger](
+    items = await merge_pending(Blog, [listing_of(blog) for blog in result])
+    blogs = PaginatedMetadata[BlogListing](
         items=items,
         pagination=PaginatedResponse(page=page, limit=limit, total=total),
     )
@@ -171,16 +178,12 @@ async def other_users(
         return {"source": "cache", "data": cache_d}
     stmt = (
         select(User)
-        .options(
-            selectinload(User.blogs),
-            selectinload(User.comments),
-            selectinload(User.shares),
-        )
         .where(
-            or_(
-                and_(User.name.ilike(f"%{name}%"), User.is_active == True),
-                and_(User.username.ilike(f"%{name}%"), User.is_active == True),
-            )
+            User.is_active == True,
+            or_(trigram_match(User.name, name), trigram_match(User.username, name)),
+        )
+        .order_by(
+            trigram_rank((User.name, name), (User.username, name)).desc(), User.id
         )
     )
     total = (
@@ -198,24 +201,17 @@ async def other_users(
     )
     username = [u.username for u in search]
     data = (
-        select(Blog)
-        .join(User)
-        .options(selectinload(Blog.comments), selectinload(Blog.user))
+        listing_query()
         .where(User.username.in_(username))
-        .order_by(Blog.time_of_post.desc())
+        .order_by(Blog.time_of_post.desc(), Blog.id.desc())
     )
     total = (
         await db.execute(select(func.count()).select_from(data.subquery()))
     ).scalar() or 0
     logger.info("Blogs found for users %s", total)
-    blogs = (await db.execute(data.offset(offset).limit(limit))).scalars().all()
-    items = []
-    for blog in blogs:
-        blog_data = Blogger.model_validate(blog)
-        blog_data.profile_picture = blog.user.profile_picture
-        blog_data.name = blog.user.name
-        items.append(blog_data)
-    blogs = PaginatedMetadata[Blogger](
+    blogs = (await db.execute(data.offset(offset).limit(limit))).all()
+    items = await merge_pending(Blog, [listing_of(blog) for blog in blogs])
+    blogs = PaginatedMetadata[BlogListing](
         items=items,
         pagination=PaginatedResponse(page=page, limit=limit, total=total),
     )
@@ -269,13 +265,12 @@ async def profile(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     if profile_picture is not None:
-        filename = f"{uuid.uuid4()}_{secure_filename(profile_picture.filename)}"
-        file_path = os.path.join("images", filename)
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(profile_picture.file, buffer)
-        file_url = f"/images/{filename}"
+        file_url = await save_upload(profile_picture)
+        await release_images(db, [user.profile_picture])
+        await acquire_images(db, [file_url])
         user.profile_picture = file_url
     else:
+        await release_images(db, [user.profile_picture])
         user.profile_picture = None
     if nationality is not None:
         user.nationality = nationality
@@ -293,6 +288,7 @@ async def profile(
     except IntegrityError:
         await db.rollback()
         raise HTTPException(status_code=500, detail="internal server error")
+    await invalidate_feeds()
     return {"message": "profile updated successfully"}
 
 
@@ -315,4 +311,5 @@ async def delete_profile(
     except IntegrityError:
         await db.rollback()
         raise HTTPException(status_code=500, detail="internal server error")
+    await invalidate_feeds()
     return {"message": "profile deleted successfully"}
@@ -1,13 +1,111 @@
 from app.models_sql import React, Blog, Comment, ReactionType
+from app.api.v1.models import ReactionsSummary
 from app.log.logger import get_loggers
+from app.utils.feed_cache import invalidate_feeds
+from app.services import counter_service
 from fastapi import HTTPException, status
-from datetime import timezone, datetime
-from sqlalchemy import select
+from sqlalchemy import select, func, delete, cast, literal, literal_column
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
 logger = get_loggers("react")
 
 
+def type_column(reaction_type) -> str:
+    return f"{ReactionType(reaction_type).value}_count"
+
+
+def summary_of(target) -> ReactionsSummary:
+    return ReactionsSummary(
+        **{
+            rtype.value: getattr(target, type_column(rtype)) or 0
+            for rtype in ReactionType
+        }
+    )
+
+
+async def count_reactions(db: AsyncSession, key_column, ids) -> dict[int, dict]:
+    ids = list(ids)
+    if not ids:
+        return {}
+    rows = (
+        await db.execute(
+            select(key_column, React.type, func.count(React.id))
+            .where(key_column.in_(ids))
+            .group_by(key_column, React.type)
+        )
+    ).all()
+    counts = {target_id: {} for target_id in ids}
+    for target_id, rtype, total in rows:
+        counts[target_id][ReactionType(rtype).value] = total
+    return counts
+
+
+FOREIGN_KEY_VIOLATION = "23503"
+
+
+def toggle_statement(user_id, key, target_id, reaction_enum):
+    constraint = "unique_blog_react" if key is React.blog_id else "unique_comment_react"
+    prev = (
+        select(React.id, React.type)
+        .where(React.user_id == user_id, key == target_id)
+        .with_for_update()
+        .cte("prev")
+    )
+    repeated = select(prev.c.id).where(prev.c.type == reaction_enum)
+    removed = (
+        delete(React).where(React.id.in_(repeated)).returning(React.id).cte("removed")
+    )
+    insert_stmt = insert(React).from_select(
+        ["user_id", key.key, "type", "time_of_reaction"],
+        select(
+            cast(literal(user_id), React.user_id.type),
+            cast(literal(target_id), key.type),
+            cast(literal(reaction_enum, React.type.type), React.type.type),
+            func.now(),
+        ).where(~repeated.exists()),
+    )
+    upserted = (
+        insert_stmt.on_conflict_do_update(
+            constraint=constraint,
+            set_={
+                "type": insert_stmt.excluded.type,
+                "time_of_reaction": insert_stmt.excluded.time_of_reaction,
+            },
+        )
+        .returning(React.type, literal_column("(xmax = 0)").label("inserted"))
+        .cte("upserted")
+    )
+    return select(
+        select(prev.c.type).scalar_subquery().label("previous"),
+        select(func.count()).select_from(removed).scalar_subquery().label("removed"),
+        select(upserted.c.inserted).scalar_subquery().label("inserted"),
+    )
+
+
+async def toggle(db, user_id, key, target_id, reaction_enum):
+    stmt = toggle_statement(user_id, key, target_id, reaction_enum)
+    savepoint = await db.begin_nested()
+    result = (await db.execute(stmt)).one()
+    if result.previous is None and not result.inserted:
+        await savepoint.rollback()
+        logger.info(f"Reaction by user {user_id} raced another insert, retrying")
+        return (await db.execute(stmt)).one()
+    await savepoint.commit()
+    return result
+
+
+def toggle_deltas(result, reaction_enum) -> dict[str, int]:
+    if result.removed:
+        return {"reacts_count": -1, type_column(result.previous): -1}
+    if result.inserted:
+        return {"reacts_count": 1, type_column(reaction_enum): 1}
+    if result.previous is not None:
+        return {type_column(result.previous): -1, type_column(reaction_enum): 1}
+    return {}
+
+
 async def react_type(
     reaction_type,
     comment_id,
@@ -31,67 +129,36 @@ async def react_type(
             status_code=status.HTTP_400_BAD_REQUEST, detail="must input one reaction"
         )
     if blog_id:
-        target = await db.get(Blog, blog_id)
-        if not target:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="must react on an existing blog",
-            )
-    if comment_id:
-        target = await db.get(Comment, comment_id)
-        if not target:
+        model, key, target_id, label = Blog, React.blog_id, blog_id, "blog"
+    else:
+        model, key, target_id, label = Comment, React.comment_id, comment_id, "comment"
+    try:
+        result = await toggle(db, user_id, key, target_id, reaction_enum)
+        deltas = toggle_deltas(result, reaction_enum)
+        deferred = counter_service.write_behind()
+        if not deferred:
+            await counter_service.increment(db, model, target_id, deltas)
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        code = getattr(e.orig, "sqlstate", None) or getattr(e.orig, "pgcode", None)
+        if code == FOREIGN_KEY_VIOLATION:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail="must react on an existing comment",
+                detail=f"must react on an existing {label}",
             )
-    stmt = select(React).where(React.user_id == user_id)
-    if blog_id:
-        stmt = stmt.where(React.blog_id == blog_id)
-    if comment_id:
-        stmt = stmt.where(React.comment_id == comment_id)
-    existing = (await db.execute(stmt)).scalar_one_or_none()
-    if existing:
-        if existing.type == reaction_enum:
-            await db.delete(existing)
-            if blog_id:
-                target.reacts_count = max((target.reacts_count or 1) - 1, 0)
-            if comment_id:
-                target.reacts_count = max((target.reacts_count or 1) - 1, 0)
-            db.add(target)
-            await db.commit()
-            logger.info(f"User {user_id} removed reaction {existing.id}")
-            return {"message": "Reaction removed", "reaction": None}
-        existing.type = reaction_enum
-        existing.time_of_reaction = datetime.now(timezone.utc)
-        try:
-            await db.commit()
-            await db.refresh(existing)
-        except IntegrityError:
-            await db.rollback()
-            logger.error(f"User {user_id} failed to update reaction {existing.id}")
-            raise HTTPException(status_code=500, detail="internal server error")
-        logger.info(f"User {user_id} updated reaction {existing.id}")
-        return {"message": "Reaction updated", "reaction": existing.type}
-    else:
-        new_react = React(
-            user_id=user_id,
-            type=reaction_enum,
-            comment_id=comment_id,
-            blog_id=blog_id,
-            time_of_reaction=datetime.now(timezone.utc),
-        )
-        try:
-            db.add(new_react)
-            if blog_id:
-                target.reacts_count = (target.reacts_count or 0) + 1
-            if comment_id:
-                target.reacts_count = (target.reacts_count or 0) + 1
-            db.add(target)
+        logger.error(f"User {user_id} failed to react on {label} {target_id}: {e}")
+        raise HTTPException(status_code=500, detail="internal server error")
+    if not deferred or not await counter_service.buffer(model, target_id, deltas):
+        if deferred:
+            await counter_service.increment(db, model, target_id, deltas)
             await db.commit()
-            await db.refresh(new_react)
-        except IntegrityError:
-            await db.rollback()
-            logger.error(f"User {user_id} failed to add new reaction")
-            raise HTTPException(status_code=500, detail="internal server error")
-    logger.info(f"User {user_id} added new reaction {new_react.id}")
-    return {"message": "Reaction added", "reaction": new_react.type}
+        await invalidate_feeds()
+    if result.removed:
+        logger.info(f"User {user_id} removed reaction on {label} {target_id}")
+        return {"message": "Reaction removed", "reaction": None}
+    if result.inserted:
+        logger.info(f"User {user_id} added new reaction on {label} {target_id}")
+        return {"message": "Reaction added", "reaction": reaction_enum}
+    logger.info(f"User {user_id} updated reaction on {label} {target_id}")
+    return {"message": "Reaction updated", "reaction": reaction_enum}
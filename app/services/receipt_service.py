@@ -0,0 +1,67 @@
+from app.log.logger import get_loggers
+from app.models_sql import Messaging, Conversation
+from sqlalchemy import update, func, case, and_
+from collections import Counter
+
+logger = get_loggers("receipts")
+
+RECEIPT_FLAGS = {
+    "delivered": {"delivered": True},
+    "seen": {"delivered": True, "seen": True},
+}
+
+
+async def acknowledge(db, username, upto_id, status="seen", conversation_ids=None):
+    flag = getattr(Messaging, status)
+    criteria = [
+        Messaging.receiver == username,
+        Messaging.id <= upto_id,
+        Messaging.receiver_deleted.is_not(True),
+        flag.is_not(True),
+    ]
+    if conversation_ids is not None:
+        criteria.append(Messaging.conversation_id.in_(conversation_ids))
+    marked = (
+        (
+            await db.execute(
+                update(Messaging)
+                .where(*criteria)
+                .values(RECEIPT_FLAGS[status])
+                .returning(Messaging.conversation_id)
+                .execution_options(synchronize_session=False)
+            )
+        )
+        .scalars()
+        .all()
+    )
+    if status == "seen":
+        for conversation_id, read in Counter(marked).items():
+            if conversation_id is None:
+                continue
+            await db.execute(
+                update(Conversation)
+                .where(Conversation.id == conversation_id)
+                .values(
+                    unread_a=case(
+                        (
+                            Conversation.user_a == username,
+                            func.greatest(Conversation.unread_a - read, 0),
+                        ),
+                        else_=Conversation.unread_a,
+                    ),
+                    unread_b=case(
+                        (
+                            and_(
+                                Conversation.user_b == username,
+                                Conversation.user_a != username,
+                            ),
+                            func.greatest(Conversation.unread_b - read, 0),
+                        ),
+                        else_=Conversation.unread_b,
+                    ),
+                )
+            )
+    logger.info(
+        f"Marked {len(marked)} messages {status} for '{username}' up to id {upto_id}"
+    )
+    return len(marked)
@@ -1,12 +1,14 @@
 from app.models_sql import Blog, Share, ShareType, User
 from app.log.logger import get_loggers
+from app.utils.feed_cache import invalidate_feeds
+from app.services import counter_service
+from app.utils.pagination import paginate
 from fastapi import HTTPException, status
 from datetime import timezone, datetime
 from sqlalchemy import select, func
 from sqlalchemy.orm import selectinload
 from sqlalchemy.exc import IntegrityError
 from app.api.v1.models import (
-    PaginatedResponse,
     Sharer,
     StandardResponse,
     PaginatedMetadata,
@@ -15,6 +17,20 @@ from app.api.v1.models import (
 logger = get_loggers("share")
 
 
+async def count_shares(db, ids) -> dict[int, int]:
+    ids = list(ids)
+    if not ids:
+        return {}
+    rows = (
+        await db.execute(
+            select(Share.blog_id, func.count(Share.id))
+            .where(Share.blog_id.in_(ids))
+            .group_by(Share.blog_id)
+        )
+    ).all()
+    return dict(rows)
+
+
 async def sharing(
     blog_id,
     content,
@@ -36,15 +52,6 @@ async def sharing(
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="input a valid reaction"
             )
-    stmt = (
-        select(Blog)
-        .join(User, User.id == Blog.user_id)
-        .where(Blog.id == blog_id, User.is_active == True)
-    )
-    blog = (await db.execute(stmt)).scalar_one_or_none()
-    if not blog:
-        logger.error("Blog not found. blog_id: %s", blog_id)
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
     new_share = Share(
         user_id=user_id,
         type=share_emu,
@@ -52,10 +59,29 @@ async def sharing(
         blog_id=blog_id,
         time_of_share=datetime.now(timezone.utc),
     )
+    deferred = counter_service.write_behind()
+    if deferred:
+        stmt = (
+            select(Blog.id)
+            .join(User, User.id == Blog.user_id)
+            .where(Blog.id == blog_id, User.is_active == True)
+        )
+        blog = (await db.execute(stmt)).first()
+    else:
+        blog = await counter_service.increment(
+            db,
+            Blog,
+            blog_id,
+            {"share_count": 1},
+            Blog.user_id == User.id,
+            User.is_active == True,
+        )
+    if not blog:
+        await db.rollback()
+        logger.error("Blog not found. blog_id: %s", blog_id)
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
     try:
         db.add(new_share)
-        blog.share_count = (blog.share_count or 0) + 1
-        db.add(blog)
         await db.commit()
         await db.refresh(new_share)
         logger.info(
@@ -64,6 +90,13 @@ async def sharing(
     except IntegrityError:
         await db.rollback()
         raise HTTPException(status_code=500, detail="internal server error")
+    if not deferred or not await counter_service.buffer(
+        Blog, blog_id, {"share_count": 1}
+    ):
+        if deferred:
+            await counter_service.increment(db, Blog, blog_id, {"share_count": 1})
+            await db.commit()
+        await invalidate_feeds()
     return "blog shared"
 
 
@@ -76,7 +109,6 @@ async def views(
     user_id = payload.get("user_id")
     if not user_id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN)
-    offset = (page - 1) * limit
     stmt = (
         (
             select(Share)
@@ -89,22 +121,16 @@ async def views(
         .where(User.is_active == True)
         .order_by(Share.time_of_share.desc())
     )
-    result = (await session.execute(stmt.offset(offset).limit(limit))).scalars().all()
+    result, pagination = await paginate(session, stmt, page, limit)
     if not result:
         raise HTTPException(status_code=404, detail="No shares found")
-    total = (
-        await session.execute(select(func.count()).select_from(stmt.subquery()))
-    ).scalar() or 0
     items = []
     for share in result:
         share_data = Sharer.model_validate(share)
         share_data.profile_picture = share.user.profile_picture
         share_data.name = share.user.name
         items.append(share_data)
-    data = PaginatedMetadata[Sharer](
-        items=items,
-        pagination=PaginatedResponse(page=page, limit=limit, total=total),
-    )
+    data = PaginatedMetadata[Sharer](items=items, pagination=pagination)
     return StandardResponse(status="success", message="your shared blogs", data=data)
 
 
@@ -148,15 +174,22 @@ async def delete_one(
     data = (await db.execute(stmt)).scalar_one_or_none()
     if not data:
         raise HTTPException(status_code=404, detail="invalid field")
-    sharer = await db.get(Blog, data.blog_id)
+    deferred = counter_service.write_behind()
     try:
         await db.delete(data)
-        sharer.share_count = max((sharer.share_count or 1) - 1, 0)
+        if not deferred:
+            await counter_service.increment(db, Blog, data.blog_id, {"share_count": -1})
         await db.commit()
         logger.info("delete_one endpoint completed successfully")
     except IntegrityError:
         await db.rollback()
         raise HTTPException(status_code=500, detail="internal server error")
+    if deferred and not await counter_service.buffer(
+        Blog, data.blog_id, {"share_count": -1}
+    ):
+        await counter_service.increment(db, Blog, data.blog_id, {"share_count": -1})
+        await db.commit()
+    await invalidate_feeds()
     return {
         "status": "success",
         "message": "share successfully deleted",
@@ -5,12 +5,12 @@ from datetime import datetime, timezone, date
 from fastapi import HTTPException
 from app.api.v1.models import (
     TaskResponse,
-    PaginatedResponse,
     StandardResponse,
     PaginatedMetadata,
     ContributeResponse,
 )
 from app.log.logger import get_loggers
+from app.utils.pagination import paginate
 
 
 logger = get_loggers("tasks")
@@ -139,18 +139,14 @@ async def get_contribution(
         raise HTTPException(
             status_code=403, detail="Username mismatch. Unauthorized task creation."
         )
-    offset = (page - 1) * limit
     stmt = select(Contribute).where(
         Contribute.user_id == user_id, Contribute.target == target
     )
-    total = (
-        await db.execute(select(func.count()).select_from(stmt.subquery()))
-    ).scalar()
     contribution = select(
         func.sum(Contribute.contribution).over(order_by=Contribute.id).label("total")
     ).where(Contribute.user_id == user_id, Contribute.target == target)
     contribution_total = (await db.execute(contribution)).scalars().all()
-    result = (await db.execute(stmt.offset(offset).limit(limit))).scalars().all()
+    result, pagination = await paginate(db, stmt, page, limit)
     if not result:
         raise HTTPException(status_code=404, detail="no contribution found")
     items = []
@@ -160,7 +156,7 @@ async def get_contribution(
         items.append(collection)
     data = PaginatedMetadata[ContributeResponse](
         items=items,
-        pagination=PaginatedResponse(page=page, limit=limit, total=total),
+        pagination=pagination,
     )
     return StandardResponse(status="success", message="contributions", data=data)
 
@@ -307,21 +303,17 @@ async def view_all_tasks(
     logger.info(
         f"Fetching tasks for user_id={user_id}, username={username}, page={page}, limit={limit}"
     )
-    offset = (page - 1) * limit
     stmt = select(Task).where(Task.user_id == user_id)
-    total = (
-        await db.execute(select(func.count()).select_from(stmt.subquery()))
-    ).scalar()
-    tasks = (await db.execute(stmt.offset(offset).limit(limit))).scalars().all()
+    tasks, pagination = await paginate(db, stmt, page, limit)
     if not tasks:
         logger.warning(f"all tasks queried, but none found for {username}")
         raise HTTPException(status_code=404, detail="No target found")
     data = PaginatedMetadata[TaskResponse](
         items=[TaskResponse.model_validate(task) for task in tasks],
-        pagination=PaginatedResponse(page=page, limit=limit, total=total),
+        pagination=pagination,
     )
     logger.info(
-        f"all tasks fetched successfully by {username}, page={page}, limit={limit}, total={total}"
+        f"all tasks fetched successfully by {username}, page={page}, limit={limit}, total={pagination.total}"
     )
     return StandardResponse(status="success", message="tasks data", data=data)
 
@@ -410,22 +402,14 @@ async def completed_data(
     username = payload.get("sub")
     if not user_id:
         raise HTTPException(status_code=403, detail="Unauthorized access.")
-    offset = (page - 1) * limit
     stmt = select(Task).where(Task.user_id == user_id, Task.complete.is_(True))
-    total = (
-        await db.execute(select(func.count()).select_from(stmt.subquery()))
-    ).scalar()
-    data = (await db.execute(stmt.offset(offset).limit(limit))).scalars().all()
+    data, pagination = await paginate(db, stmt, page, limit)
     if not data:
         raise HTTPException(status_code=404, detail="you have no completed target")
     logger.info(f"{username} successfully queried completed tasks")
     check = PaginatedMetadata[TaskResponse](
         items=[TaskResponse.model_validate(task) for task in data],
-        pagination=PaginatedResponse(
-            page=page,
-            limit=limit,
-            total=total,
-        ),
+        pagination=pagination,
     )
     return StandardResponse(
         status="success",
@@ -444,22 +428,14 @@ async def not_complete(
     username = payload.get("sub")
     if not user_id:
         raise HTTPException(status_code=403, detail="Unauthorized access.")
-    offset = (page - 1) * limit
     stmt = select(Task).where(Task.user_id == user_id, Task.complete == False)
-    total = (
-        await db.execute(select(func.count()).select_from(stmt.subquery()))
-    ).scalar()
-    data = (await db.execute(stmt.offset(offset).limit(limit))).scalars().all()
+    data, pagination = await paginate(db, stmt, page, limit)
     if not data:
         raise HTTPException(status_code=404, detail="you have no uncompleted target")
     logger.info(f"{username} successfully queried uncompleted tasks")
     check = PaginatedMetadata[TaskResponse](
         items=[TaskResponse.model_validate(task) for task in data],
-        pagination=PaginatedResponse(
-            page=page,
-            limit=limit,
-            total=total,
-        ),
+        pagination=pagination,
     )
     return StandardResponse(
         status="success",
@@ -478,35 +454,21 @@ async def unaccomplished(
     username = payload.get("sub")
     if not user_id:
         raise HTTPException(status_code=403, detail="Unauthorized access.")
-    offset = (page - 1) * limit
     now = datetime.now(timezone.utc)
     stmt = select(Task).where(
         Task.user_id == user_id,
         Task.day_of_target <= now,
         Task.complete.is_(False),
     )
-    total = (
-        await db.execute(select(func.count()).select_from(stmt.subquery()))
-    ).scalar()
-    data = (
-        (
-            await db.execute(
-                stmt.order_by(Task.day_of_target.asc()).offset(offset).limit(limit)
-            )
-        )
-        .scalars()
-        .all()
+    data, pagination = await paginate(
+        db, stmt.order_by(Task.day_of_target.asc()), page, limit
     )
     if not data:
         raise HTTPException(status_code=404, detail="you have no unaccomplished task")
     logger.info(f"{username} successfully queried expired tasks")
     check = PaginatedMetadata[TaskResponse](
         items=[TaskResponse.model_validate(task) for task in data],
-        pagination=PaginatedResponse(
-            page=page,
-            limit=limit,
-            total=total,
-        ),
+        pagination=pagination,
     )
     return StandardResponse(status="success", message="task executed", data=check)
 
@@ -0,0 +1,153 @@
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import update, func
+from sqlalchemy.dialects.postgresql import insert
+from app.core.config import settings
+from app.log.logger import get_loggers
+from app.core.celery_app import generate_image_variants
+from app.models_sql import ImageBlob
+from collections import Counter
+from datetime import datetime, timezone
+import hashlib, os, re, time, uuid
+
+logger = get_loggers("uploads")
+os.makedirs("images", exist_ok=True)
+
+SIGNATURES = {
+    "image/jpeg": (b"\xff\xd8\xff",),
+    "image/png": (b"\x89PNG\r\n\x1a\n",),
+    "image/gif": (b"GIF87a", b"GIF89a"),
+    "image/webp": (b"RIFF",),
+}
+EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/gif": "gif",
+    "image/webp": "webp",
+}
+BLOB_URL = re.compile(r"^/images/[0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{64})\.\w+$")
+
+
+def sniff(head: bytes) -> str | None:
+    for content_type, magic in SIGNATURES.items():
+        if head.startswith(magic):
+            if content_type == "image/webp" and head[8:12] != b"WEBP":
+                continue
+            return content_type
+    return None
+
+
+def _discard(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def schedule_variants(urls: list[str]):
+    try:
+        generate_image_variants.delay(urls)
+    except Exception as e:
+        logger.warning(f"Could not queue image variants for {urls}: {e}")
+
+
+def blob_digest(url: str | None) -> str | None:
+    match = BLOB_URL.match(url or "")
+    return match.group(1) if match else None
+
+
+def _place(tmp_path: str, blob_path: str) -> bool:
+    try:
+        os.utime(blob_path)
+    except FileNotFoundError:
+        pass
+    else:
+        _discard(tmp_path)
+        return False
+    os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+    os.replace(tmp_path, blob_path)
+    return True
+
+
+async def save_upload(file, folder: str = "images") -> str:
+    allowed = settings.UPLOAD_ALLOWED_TYPES
+    if file.content_type and file.content_type not in allowed:
+        raise HTTPException(status_code=415, detail="unsupported file type")
+    tmp_dir = os.path.join(folder, "tmp")
+    await run_in_threadpool(os.makedirs, tmp_dir, exist_ok=True)
+    tmp_path = os.path.join(tmp_dir, f"{uuid.uuid4()}.part")
+    digest = hashlib.sha256()
+    content_type = None
+    size = 0
+    started = time.perf_counter()
+    buffer = await run_in_threadpool(open, tmp_path, "wb")
+    try:
+        while chunk := await file.read(settings.UPLOAD_CHUNK_SIZE):
+            if size == 0:
+                content_type = sniff(chunk)
+                if content_type not in allowed:
+                    raise HTTPException(status_code=415, detail="unsupported file type")
+            size += len(chunk)
+            if size > settings.UPLOAD_MAX_BYTES:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"file exceeds {settings.UPLOAD_MAX_BYTES} bytes",
+                )
+            digest.update(chunk)
+            await run_in_threadpool(buffer.write, chunk)
+    except BaseException:
+        await run_in_threadpool(buffer.close)
+        await run_in_threadpool(_discard, tmp_path)
+        raise
+    await run_in_threadpool(buffer.close)
+    if size == 0:
+        await run_in_threadpool(_discard, tmp_path)
+        raise HTTPException(status_code=400, detail="empty file")
+    key = digest.hexdigest()
+    relative = f"{key[:2]}/{key[2:4]}/{key}.{EXTENSIONS[content_type]}"
+    created = await run_in_threadpool(
+        _place, tmp_path, os.path.join(folder, *relative.split("/"))
+    )
+    elapsed = max(time.perf_counter() - started, 1e-6)
+    logger.info(
+        f"stored upload {relative} ({'new' if created else 'duplicate'}): {size} bytes in {elapsed:.3f}s ({size / elapsed:.0f} bytes/sec)"
+    )
+    file_url = f"/{folder}/{relative}"
+    if created:
+        await run_in_threadpool(schedule_variants, [file_url])
+    return file_url
+
+
+async def save_uploads(files, folder: str = "images") -> list[str]:
+    return [await save_upload(file, folder) for file in files]
+
+
+async def acquire_images(db, urls):
+    now = datetime.now(timezone.utc)
+    for url, uses in Counter(url for url in urls if blob_digest(url)).items():
+        stmt = insert(ImageBlob).values(
+            digest=blob_digest(url),
+            url=url,
+            ref_count=uses,
+            created_at=now,
+            updated_at=now,
+        )
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[ImageBlob.digest],
+                set_={"ref_count": ImageBlob.ref_count + uses, "updated_at": now},
+            )
+        )
+
+
+async def release_images(db, urls):
+    now = datetime.now(timezone.utc)
+    for url, uses in Counter(url for url in urls if blob_digest(url)).items():
+        await db.execute(
+            update(ImageBlob)
+            .where(ImageBlob.digest == blob_digest(url))
+            .values(
+                ref_count=func.greatest(ImageBlob.ref_count - uses, 0),
+                updated_at=now,
+            )
+        )
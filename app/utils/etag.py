@@ -0,0 +1,53 @@
+from fastapi import Request, Response
+from sqlalchemy import select, func, inspect
+import hashlib
+import json
+import time
+
+CACHE_CONTROL = "private, no-cache"
+
+
+def compute_etag(*markers) -> str:
+    raw = json.dumps(markers, default=str, separators=(",", ":"))
+    return f'"{hashlib.sha1(raw.encode()).hexdigest()}"'
+
+
+def etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    tags = [tag.strip() for tag in header.split(",")]
+    return etag in [tag[2:] if tag.startswith("W/") else tag for tag in tags]
+
+
+def minute_bucket() -> int:
+    return int(time.time() // 60)
+
+
+def change_markers(model, *criteria, extra=()):
+    table = inspect(model).local_table if hasattr(model, "__mapper__") else model
+    markers = [func.count()]
+    for name in ("id", "updated_at"):
+        if name in table.c:
+            markers.append(func.max(table.c[name]))
+    markers.extend(extra)
+    return (
+        select(func.concat_ws(":", *markers))
+        .select_from(table)
+        .where(*criteria)
+        .scalar_subquery()
+    )
+
+
+def conditional(request: Request, response: Response, markers) -> Response | None:
+    if markers is None:
+        return None
+    etag = compute_etag(request.url.path, *markers)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(
+            status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        )
+    return None
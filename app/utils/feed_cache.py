@@ -0,0 +1,50 @@
+from app.core.redis_config import async_redis_client
+from app.core.config import settings
+from app.log.logger import get_loggers
+import json
+
+logger = get_loggers("feed_cache")
+
+GENERATION_KEY = "blogs:feed:gen"
+
+
+async def feed_generation() -> int | None:
+    try:
+        return int(await async_redis_client.get(GENERATION_KEY) or 0)
+    except Exception as e:
+        logger.warning(f"Feed cache unavailable: {e}")
+        return None
+
+
+async def page_key(kind: str, *parts) -> str | None:
+    generation = await feed_generation()
+    if generation is None:
+        return None
+    return ":".join(["blogs", "feed", str(generation), kind, *map(str, parts)])
+
+
+async def get_page(key: str | None):
+    if key is None:
+        return None
+    try:
+        value = await async_redis_client.get(key)
+    except Exception as e:
+        logger.warning(f"Feed cache read failed for {key}: {e}")
+        return None
+    return json.loads(value) if value else None
+
+
+async def set_page(key: str | None, response, ttl: int = settings.FEED_CACHE_TTL):
+    if key is None:
+        return
+    try:
+        await async_redis_client.set(key, response.model_dump_json(), ex=ttl)
+    except Exception as e:
+        logger.warning(f"Feed cache write failed for {key}: {e}")
+
+
+async def invalidate_feeds():
+    try:
+        await async_redis_client.incr(GENERATION_KEY)
+    except Exception as e:
+        logger.warning(f"Feed cache invalidation failed: {e}")
@@ -0,0 +1,84 @@
+from app.log.logger import get_loggers
+import json
+import os
+
+logger = get_loggers("images")
+
+VARIANT_DIR = os.path.join("images", "variants")
+VARIANT_SIZES = {"thumb": 320, "medium": 960}
+VARIANT_FORMATS = {"webp": "WEBP", "jpg": "JPEG"}
+
+
+def variant_path(source: str, size: str, ext: str) -> str:
+    stem = os.path.splitext(os.path.basename(source))[0]
+    return os.path.join(VARIANT_DIR, f"{stem}_{size}.{ext}")
+
+
+def variant_url(url: str, size: str, ext: str) -> str:
+    return "/" + variant_path(url, size, ext).replace(os.sep, "/")
+
+
+def variants_of(url: str | None) -> dict[str, str] | None:
+    if not url:
+        return None
+    variants = {
+        f"{size}_{ext}": variant_url(url, size, ext)
+        for size in VARIANT_SIZES
+        for ext in VARIANT_FORMATS
+        if os.path.isfile(variant_path(url, size, ext))
+    }
+    return variants or None
+
+
+def image_urls(value) -> list[str]:
+    if not value:
+        return []
+    if isinstance(value, list):
+        return [url for url in value if url]
+    try:
+        urls = json.loads(value)
+    except (TypeError, ValueError):
+        return [value]
+    return urls if isinstance(urls, list) else [value]
+
+
+def render_variants(source: str) -> list[str]:
+    from PIL import Image, ImageOps
+
+    os.makedirs(VARIANT_DIR, exist_ok=True)
+    written = []
+    with Image.open(source) as original:
+        original = ImageOps.exif_transpose(original)
+        for size, bound in VARIANT_SIZES.items():
+            resized = original.copy()
+            resized.thumbnail((bound, bound))
+            for ext, fmt in VARIANT_FORMATS.items():
+                target = variant_path(source, size, ext)
+                if os.path.exists(target):
+                    continue
+                image = resized
+                if fmt == "JPEG" and image.mode != "RGB":
+                    image = image.convert("RGB")
+                elif image.mode not in ("RGB", "RGBA"):
+                    image = image.convert("RGBA")
+                tmp = f"{target}.tmp"
+                image.save(tmp, fmt, quality=80, optimize=True)
+                os.replace(tmp, target)
+                written.append(target)
+    return written
+
+
+def iter_files(root: str):
+    pending = [root]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry.path, entry.stat(follow_symlinks=False)
+
+
+def variant_source_stem(path: str) -> str:
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return stem.rsplit("_", 1)[0]
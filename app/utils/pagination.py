@@ -0,0 +1,133 @@
+from fastapi import HTTPException
+from sqlalchemy import tuple_, select, func
+from sqlalchemy.dialects import postgresql
+from app.api.v1.models import PaginatedResponse
+from app.core.config import settings
+from app.core.redis_config import async_redis_client
+from app.log.logger import get_loggers
+from datetime import datetime
+import base64
+import binascii
+import hashlib
+import json
+
+logger = get_loggers("pagination")
+
+COUNT_STRATEGIES = ("exact", "cached", "estimate", "has_more")
+
+
+def encode_cursor(sort: str, values) -> str:
+    keys = [
+        {"dt": value.isoformat()} if isinstance(value, datetime) else value
+        for value in values
+    ]
+    raw = json.dumps({"s": sort, "k": keys}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if data.get("s") != sort:
+            raise ValueError("cursor belongs to another sort order")
+        return [
+            datetime.fromisoformat(key["dt"]) if isinstance(key, dict) else key
+            for key in data["k"]
+        ]
+    except (ValueError, KeyError, TypeError, AttributeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="invalid cursor")
+
+
+def keyset_lt(columns, values):
+    if len(columns) != len(values):
+        raise HTTPException(status_code=400, detail="invalid cursor")
+    return tuple_(*columns) < tuple_(*values)
+
+
+def keyset_gt(columns, values):
+    if len(columns) != len(values):
+        raise HTTPException(status_code=400, detail="invalid cursor")
+    return tuple_(*columns) > tuple_(*values)
+
+
+async def exact_count(db, stmt) -> int:
+    return (
+        await db.execute(select(func.count()).select_from(stmt.subquery()))
+    ).scalar() or 0
+
+
+async def cached_count(db, stmt) -> int:
+    compiled = stmt.compile(dialect=postgresql.dialect())
+    digest = hashlib.sha1(
+        f"{compiled}|{sorted(compiled.params.items(), key=str)}".encode()
+    ).hexdigest()
+    key = f"count:{digest}"
+    try:
+        value = await async_redis_client.get(key)
+        if value is not None:
+            return int(value)
+    except Exception as e:
+        logger.warning(f"Count cache read failed: {e}")
+    total = await exact_count(db, stmt)
+    try:
+        await async_redis_client.set(key, total, ex=settings.PAGINATION_COUNT_TTL)
+    except Exception as e:
+        logger.warning(f"Count cache write failed: {e}")
+    return total
+
+
+async def estimated_count(db, stmt) -> int:
+    try:
+        compiled = stmt.compile(
+            dialect=db.get_bind().dialect,
+            compile_kwargs={"render_postcompile": True},
+        )
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+        async with db.begin_nested():
+            conn = await db.connection()
+            plan = (
+                await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params)
+            ).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception as e:
+        logger.warning(f"Planner estimate unavailable, counting exactly: {e}")
+        return await exact_count(db, stmt)
+
+
+async def paginate(
+    db,
+    stmt,
+    page: int,
+    limit: int,
+    strategy: str | None = None,
+    scalars: bool = True,
+    offset: int | None = None,
+):
+    strategy = strategy or settings.PAGINATION_COUNT_STRATEGY
+    if strategy not in COUNT_STRATEGIES:
+        logger.warning(f"Unknown count strategy '{strategy}', using exact")
+        strategy = "exact"
+    if offset is None:
+        offset = (page - 1) * limit
+    total = None
+    counted = stmt.order_by(None)
+    if strategy == "exact":
+        total = await exact_count(db, counted)
+    elif strategy == "cached":
+        total = await cached_count(db, counted)
+    elif strategy == "estimate":
+        total = await estimated_count(db, counted)
+    result = await db.execute(stmt.offset(offset).limit(limit + 1))
+    rows = result.scalars().all() if scalars else result.all()
+    has_more = len(rows) > limit
+    pagination = PaginatedResponse(
+        page=page,
+        limit=limit,
+        total=total,
+        has_more=has_more,
+        count_strategy=strategy,
+    )
+    return rows[:limit], pagination
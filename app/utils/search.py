@@ -0,0 +1,14 @@
+from sqlalchemy import func
+
+
+def escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def trigram_match(column, term: str):
+    return column.ilike(f"%{escape_like(term)}%", escape="\\")
+
+
+def trigram_rank(*pairs):
+    scores = [func.similarity(column, term) for column, term in pairs]
+    return scores[0] if len(scores) == 1 else func.greatest(*scores)
@@ -0,0 +1,59 @@
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+from app.core.config import settings
+import hashlib
+import mimetypes
+import os
+import re
+
+DIGEST_NAME = re.compile(r"^[0-9a-f]{64}$")
+HANDOFF_HEADERS = {"x-accel": "X-Accel-Redirect", "x-sendfile": "X-Sendfile"}
+
+
+def strong_etag(full_path, stat_result: os.stat_result) -> str:
+    stem = os.path.splitext(os.path.basename(full_path))[0]
+    if DIGEST_NAME.match(stem):
+        return f'"{stem}"'
+    base = f"{stem}-{stat_result.st_size}-{stat_result.st_mtime_ns}"
+    return f'"{hashlib.sha256(base.encode()).hexdigest()[:32]}"'
+
+
+class ImageFiles(StaticFiles):
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        headers = {
+            "cache-control": settings.IMAGE_CACHE_CONTROL,
+            "etag": strong_etag(full_path, stat_result),
+        }
+        handoff = HANDOFF_HEADERS.get((settings.IMAGE_SENDFILE_MODE or "").lower())
+        if handoff:
+            if handoff == "X-Accel-Redirect":
+                relative = os.path.relpath(full_path, self.directory)
+                target = settings.IMAGE_ACCEL_PREFIX.rstrip("/") + "/"
+                target += relative.replace(os.sep, "/")
+            else:
+                target = os.path.abspath(full_path)
+            headers[handoff] = target
+            response = Response(
+                status_code=status_code,
+                headers=headers,
+                media_type=mimetypes.guess_type(str(full_path))[0],
+            )
+        else:
+            response = FileResponse(
+                full_path,
+                status_code=status_code,
+                stat_result=stat_result,
+                headers=headers,
+            )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
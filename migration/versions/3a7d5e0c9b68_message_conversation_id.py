@@ -0,0 +1,50 @@
+"""message conversation id
+
+Revision ID: 3a7d5e0c9b68
+Revises: b6c2e9f1d473
+Create Date: 2026-10-17 17:02:37.884310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a7d5e0c9b68'
+down_revision: Union[str, Sequence[str], None] = 'b6c2e9f1d473'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('messages', sa.Column('conversation_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('fk_messages_conversation_id', 'messages', 'conversations', ['conversation_id'], ['id'], ondelete='SET NULL')
+    bind = op.get_bind()
+    low, high = bind.execute(sa.text('SELECT min(id), max(id) FROM messages')).one()
+    if low is not None:
+        backfill = sa.text(
+            '''
+            UPDATE messages m SET conversation_id = c.id
+            FROM conversations c
+            WHERE m.id >= :low AND m.id < :high
+            AND m.conversation_id IS NULL
+            AND c.user_a = least(m.username COLLATE "C", m.receiver COLLATE "C")
+            AND c.user_b = greatest(m.username COLLATE "C", m.receiver COLLATE "C")
+            '''
+        )
+        with op.get_context().autocommit_block():
+            for start in range(low, high + 1, BATCH_SIZE):
+                bind.execute(backfill, {'low': start, 'high': start + BATCH_SIZE})
+    op.create_index('ix_messages_conversation_time', 'messages', ['conversation_id', sa.text('time_of_chat DESC'), 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_messages_conversation_time', table_name='messages')
+    op.drop_constraint('fk_messages_conversation_id', 'messages', type_='foreignkey')
+    op.drop_column('messages', 'conversation_id')
@@ -0,0 +1,30 @@
+"""blog hot score
+
+Revision ID: 5e8a0d3c6b21
+Revises: c41d8e2b7f93
+Create Date: 2026-10-17 10:41:27.903614
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e8a0d3c6b21'
+down_revision: Union[str, Sequence[str], None] = 'c41d8e2b7f93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('blogs', sa.Column('hot_score', sa.Float(), server_default='0', nullable=True))
+    op.create_index('ix_blogs_hot_score', 'blogs', ['hot_score', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_blogs_hot_score', table_name='blogs')
+    op.drop_column('blogs', 'hot_score')
@@ -0,0 +1,47 @@
+"""reaction type counters
+
+Revision ID: 7b2f9c4e1a05
+Revises: 34e1e3d1343d
+Create Date: 2026-10-17 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b2f9c4e1a05'
+down_revision: Union[str, Sequence[str], None] = '34e1e3d1343d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+REACTION_TYPES = ('like', 'love', 'wow', 'haha', 'sad', 'angry')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, key in (('blogs', 'blog_id'), ('comments', 'comment_id')):
+        for rtype in REACTION_TYPES:
+            op.add_column(table, sa.Column(f'{rtype}_count', sa.Integer(), server_default='0', nullable=True))
+        op.execute(
+            f"""
+            UPDATE {table} SET {', '.join(f"{rtype}_count = counts.{rtype}" for rtype in REACTION_TYPES)}
+            FROM (
+                SELECT {key} AS target_id,
+                       {', '.join(f"count(*) FILTER (WHERE type = '{rtype}') AS {rtype}" for rtype in REACTION_TYPES)}
+                FROM reacts
+                WHERE {key} IS NOT NULL
+                GROUP BY {key}
+            ) AS counts
+            WHERE {table}.id = counts.target_id
+            """
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ('comments', 'blogs'):
+        for rtype in reversed(REACTION_TYPES):
+            op.drop_column(table, f'{rtype}_count')
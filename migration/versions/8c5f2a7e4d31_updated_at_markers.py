@@ -0,0 +1,32 @@
+"""updated_at markers
+
+Revision ID: 8c5f2a7e4d31
+Revises: 3a7d5e0c9b68
+Create Date: 2026-10-17 18:11:52.406219
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c5f2a7e4d31'
+down_revision: Union[str, Sequence[str], None] = '3a7d5e0c9b68'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('users', 'tasks', 'group_tasks', 'participants', 'group_admins', 'opinions', 'shares')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in TABLES:
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        op.drop_column(table, 'updated_at')
@@ -0,0 +1,84 @@
+"""conversations
+
+Revision ID: b6c2e9f1d473
+Revises: f4a81c3d9e27
+Create Date: 2026-10-17 16:21:09.537142
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6c2e9f1d473'
+down_revision: Union[str, Sequence[str], None] = 'f4a81c3d9e27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('conversations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_a', sa.String(), nullable=False),
+    sa.Column('user_b', sa.String(), nullable=False),
+    sa.Column('last_message_id', sa.Integer(), nullable=True),
+    sa.Column('last_message_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('unread_a', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('unread_b', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('deleted_a', sa.Boolean(), server_default='false', nullable=False),
+    sa.Column('deleted_b', sa.Boolean(), server_default='false', nullable=False),
+    sa.ForeignKeyConstraint(['last_message_id'], ['messages.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_a', 'user_b', name='unique_conversation_pair')
+    )
+    op.create_index(op.f('ix_conversations_id'), 'conversations', ['id'], unique=False)
+    op.create_index('ix_conversations_a_recent', 'conversations', ['user_a', 'last_message_at', 'id'], unique=False)
+    op.create_index('ix_conversations_b_recent', 'conversations', ['user_b', 'last_message_at', 'id'], unique=False)
+    op.execute(
+        '''
+        WITH pairs AS (
+            SELECT id, username, receiver, time_of_chat, seen,
+                   sender_deleted, receiver_deleted,
+                   least(username COLLATE "C", receiver COLLATE "C") AS user_a,
+                   greatest(username COLLATE "C", receiver COLLATE "C") AS user_b
+            FROM messages
+            WHERE username IS NOT NULL AND receiver IS NOT NULL
+        )
+        INSERT INTO conversations (
+            user_a, user_b, last_message_id, last_message_at,
+            unread_a, unread_b, deleted_a, deleted_b
+        )
+        SELECT user_a, user_b,
+               (array_agg(id ORDER BY time_of_chat DESC NULLS LAST, id DESC))[1],
+               max(time_of_chat),
+               count(*) FILTER (
+                   WHERE receiver = user_a AND username <> receiver
+                   AND seen IS NOT TRUE AND receiver_deleted IS NOT TRUE
+               ),
+               count(*) FILTER (
+                   WHERE receiver = user_b AND username <> receiver
+                   AND seen IS NOT TRUE AND receiver_deleted IS NOT TRUE
+               ),
+               bool_and(NOT (
+                   (username = user_a AND sender_deleted IS NOT TRUE)
+                   OR (receiver = user_a AND receiver_deleted IS NOT TRUE)
+               )),
+               bool_and(NOT (
+                   (username = user_b AND sender_deleted IS NOT TRUE)
+                   OR (receiver = user_b AND receiver_deleted IS NOT TRUE)
+               ))
+        FROM pairs
+        GROUP BY user_a, user_b
+        '''
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_conversations_b_recent', table_name='conversations')
+    op.drop_index('ix_conversations_a_recent', table_name='conversations')
+    op.drop_index(op.f('ix_conversations_id'), table_name='conversations')
+    op.drop_table('conversations')
@@ -0,0 +1,33 @@
+"""trigram search indexes
+
+Revision ID: c41d8e2b7f93
+Revises: 7b2f9c4e1a05
+Create Date: 2026-10-17 10:03:11.542871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d8e2b7f93'
+down_revision: Union[str, Sequence[str], None] = '7b2f9c4e1a05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index('ix_users_name_trgm', 'users', ['name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index('ix_users_username_trgm', 'users', ['username'], unique=False, postgresql_using='gin', postgresql_ops={'username': 'gin_trgm_ops'})
+    op.create_index('ix_blogs_target_trgm', 'blogs', ['target'], unique=False, postgresql_using='gin', postgresql_ops={'target': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_blogs_target_trgm', table_name='blogs', postgresql_using='gin')
+    op.drop_index('ix_users_username_trgm', table_name='users', postgresql_using='gin')
+    op.drop_index('ix_users_name_trgm', table_name='users', postgresql_using='gin')
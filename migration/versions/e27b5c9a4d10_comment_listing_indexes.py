@@ -0,0 +1,39 @@
+"""comment listing indexes
+
+Revision ID: e27b5c9a4d10
+Revises: 9d3f6a2b8c14
+Create Date: 2026-10-17 14:22:09.551370
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e27b5c9a4d10'
+down_revision: Union[str, Sequence[str], None] = '9d3f6a2b8c14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('UPDATE comments SET reacts_count = 0 WHERE reacts_count IS NULL')
+    op.alter_column('comments', 'reacts_count',
+               existing_type=sa.INTEGER(),
+               server_default='0',
+               existing_nullable=True)
+    op.create_index('ix_comments_blog_time', 'comments', ['blog_id', 'time_of_post', 'id'], unique=False)
+    op.create_index('ix_comments_blog_reacts', 'comments', ['blog_id', 'reacts_count', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_comments_blog_reacts', table_name='comments')
+    op.drop_index('ix_comments_blog_time', table_name='comments')
+    op.alter_column('comments', 'reacts_count',
+               existing_type=sa.INTEGER(),
+               server_default=None,
+               existing_nullable=True)
@@ -0,0 +1,33 @@
+"""restore comment react unique constraint
+
+Revision ID: f4a81c3d9e27
+Revises: e27b5c9a4d10
+Create Date: 2026-10-17 15:03:44.120958
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4a81c3d9e27'
+down_revision: Union[str, Sequence[str], None] = 'e27b5c9a4d10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        'DELETE FROM reacts r USING reacts d '
+        'WHERE r.comment_id IS NOT NULL AND r.user_id = d.user_id '
+        'AND r.comment_id = d.comment_id AND r.id < d.id'
+    )
+    op.create_unique_constraint('unique_comment_react', 'reacts', ['user_id', 'comment_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('unique_comment_react', 'reacts', type_='unique')